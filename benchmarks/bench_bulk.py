@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Throughput and memory benchmark for bulk_pricing.py: generates wall tables of increasing size
+(default 1M and 10M rows), prices each in a fresh process and reports rows/s and the process's
+peak RSS, which should stay flat as the row count grows. Parquet is included when pyarrow is
+installed.
+
+Usage:
+    python benchmarks/bench_bulk.py
+    python benchmarks/bench_bulk.py --rows 100000 1000000 10000000 --chunk-rows 200000 --keep /tmp/bulk
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from typing import List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+GEN_CHUNK = 500_000
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark bulk_pricing.py on generated tables")
+    p.add_argument("--rows", nargs="+", type=int, default=[1_000_000, 10_000_000],
+                   help="Table sizes to generate (default: 1000000 10000000)")
+    p.add_argument("--chunk-rows", type=int, default=100_000, help="Passed to bulk_pricing.py (default: 100000)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--keep", metavar="DIR", help="Write the tables here and keep them (default: a temp dir)")
+    return p.parse_args()
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def generate_csv(path: str, rows: int, rng: np.random.Generator) -> None:
+    """id, w_px, h_px, ref_m, ref_px; about 1% of rows have an empty w_px like failed measurements."""
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        fh.write("id,w_px,h_px,ref_m,ref_px\n")
+        for start in range(0, rows, GEN_CHUNK):
+            n = min(GEN_CHUNK, rows - start)
+            w = rng.integers(200, 6000, n)
+            h = rng.integers(200, 4000, n)
+            ref_m = np.round(rng.uniform(0.5, 2.0, n), 3)
+            ref_px = rng.integers(50, 500, n)
+            missing = rng.random(n) < 0.01
+            lines = [f"{start + i},{'' if missing[i] else w[i]},{h[i]},{ref_m[i]},{ref_px[i]}" for i in range(n)]
+            fh.write("\n".join(lines) + "\n")
+
+
+def generate_parquet(path: str, rows: int, rng: np.random.Generator) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    writer = None
+    try:
+        for start in range(0, rows, GEN_CHUNK):
+            n = min(GEN_CHUNK, rows - start)
+            w = rng.integers(200, 6000, n).astype(np.float64)
+            w[rng.random(n) < 0.01] = np.nan
+            table = pa.table({
+                "id": np.arange(start, start + n),
+                "w_px": pa.array(w, from_pandas=True),
+                "h_px": rng.integers(200, 4000, n).astype(np.float64),
+                "ref_m": np.round(rng.uniform(0.5, 2.0, n), 3),
+                "ref_px": rng.integers(50, 500, n).astype(np.float64),
+            })
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def run_pricing(src: str, dst: str, chunk_rows: int) -> Tuple[float, float]:
+    """Run bulk_pricing.py in a child process; returns (seconds, child peak RSS in MB)."""
+    cmd = [sys.executable, os.path.join(ROOT, "bulk_pricing.py"), src, dst, "--chunk-rows", str(chunk_rows),
+           "--product", "standard:10:2", "--product", "premium:12:1"]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    stderr = proc.stderr.read().decode()
+    proc.stderr.close()
+    if status != 0:
+        raise SystemExit(f"bulk_pricing.py failed:\n{stderr}")
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    rss_mb = usage.ru_maxrss / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0)
+    return elapsed, rss_mb
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    workdir = args.keep or tempfile.mkdtemp(prefix="bench_bulk_")
+    os.makedirs(workdir, exist_ok=True)
+    formats: List[str] = ["csv"] + (["parquet"] if parquet_available() else [])
+    if "parquet" not in formats:
+        print("pyarrow not installed: CSV only")
+    try:
+        for fmt in formats:
+            for rows in args.rows:
+                src = os.path.join(workdir, f"walls_{rows}.{fmt}")
+                dst = os.path.join(workdir, f"priced_{rows}.{fmt}")
+                start = time.perf_counter()
+                (generate_csv if fmt == "csv" else generate_parquet)(src, rows, rng)
+                gen = time.perf_counter() - start
+                elapsed, rss_mb = run_pricing(src, dst, args.chunk_rows)
+                size_mb = os.path.getsize(src) / 1e6
+                print(f"{fmt:>7} {rows:>11,} rows ({size_mb:7.1f} MB, generated in {gen:5.1f}s): "
+                      f"{elapsed:6.2f}s, {rows / elapsed:>11,.0f} rows/s, peak RSS {rss_mb:6.1f} MB")
+                if not args.keep:
+                    os.remove(src)
+                    os.remove(dst)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
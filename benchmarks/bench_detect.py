@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Speed and accuracy benchmark for wall_measure.find_wall_bbox_front on procedurally generated walls
+with a known ground-truth rectangle, at several resolutions and noise levels.
+
+Reports per-stage latency (cvtColor, GaussianBlur, Canny, findContours, contour selection), end-to-end
+images/s, peak memory and bbox IoU, and writes everything to JSON. Contour selection is also checked
+against the reference ``max(contours, key=cv2.contourArea)``; any differing choice is counted.
+Pass a previous run as --baseline to print the relative change per case.
+
+Usage:
+    python benchmarks/bench_detect.py --out bench_detect.json
+    python benchmarks/bench_detect.py --out new.json --baseline bench_detect.json
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+import wall_measure as wm  # noqa: E402
+
+RESOLUTIONS = {"vga": (640, 480), "fhd": (1920, 1080), "12mp": (4032, 3024), "24mp": (6000, 4000)}
+STAGES = ("cvtColor", "GaussianBlur", "Canny", "findContours", "select")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark the wall detection pipeline")
+    p.add_argument("--resolutions", nargs="+", default=["vga", "fhd", "12mp"], choices=sorted(RESOLUTIONS),
+                   help="Image sizes to generate (default: vga fhd 12mp)")
+    p.add_argument("--noise", nargs="+", type=float, default=[0.0, 8.0, 25.0],
+                   help="Gaussian noise sigmas in grey levels (default: 0 8 25)")
+    p.add_argument("--speckle", type=float, default=0.0,
+                   help="Fraction of pixels turned into bright specks on the wall, to produce thousands of "
+                        "small contours like a textured wall (e.g. 0.003; default: 0)")
+    p.add_argument("--images", type=int, default=5, help="Images per case (default: 5)")
+    p.add_argument("--repeat", type=int, default=3, help="Timed runs per image, best is kept (default: 3)")
+    p.add_argument("--max-side", type=int, default=None, help="Pass max_side to find_wall_bbox_front")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", help="Write results to this JSON file")
+    p.add_argument("--baseline", help="Earlier JSON results to compare against")
+    return p.parse_args()
+
+
+def synthetic_wall(size: Tuple[int, int], noise: float, rng: np.random.Generator, speckle: float = 0.0):
+    """Textured background with one darker wall rectangle; returns (BGR image, ground-truth (x, y, w, h))."""
+    w, h = size
+    bg = rng.integers(170, 230, 3)
+    img = np.empty((h, w, 3), np.uint8)
+    img[:] = bg
+    # a few faint horizontal/vertical stripes as clutter outside the wall
+    for _ in range(4):
+        y = int(rng.integers(0, h))
+        img[y:y + max(1, h // 200), :] = np.clip(bg.astype(int) - 15, 0, 255)
+    gx0, gy0 = int(rng.uniform(0.05, 0.25) * w), int(rng.uniform(0.05, 0.25) * h)
+    gx1, gy1 = int(rng.uniform(0.75, 0.95) * w), int(rng.uniform(0.75, 0.95) * h)
+    img[gy0:gy1, gx0:gx1] = rng.integers(40, 120, 3)
+    if speckle > 0:
+        specks = (rng.random((h, w)) < speckle).astype(np.uint8)
+        img[cv2.dilate(specks, np.ones((4, 4), np.uint8)) > 0] = 255
+    if noise > 0:
+        img = np.clip(img + rng.normal(0.0, noise, img.shape), 0, 255).astype(np.uint8)
+    return img, (gx0, gy0, gx1 - gx0, gy1 - gy0)
+
+
+def iou(a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -> float:
+    ax0, ay0, aw, ah = a
+    bx0, by0, bw, bh = b
+    ix = max(0, min(ax0 + aw, bx0 + bw) - max(ax0, bx0))
+    iy = max(0, min(ay0 + ah, by0 + bh) - max(ay0, by0))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+def stage_times(img) -> Dict[str, float]:
+    """Time each stage of the full-resolution pipeline (same calls as wall_measure) in milliseconds."""
+    t = {}
+    start = time.perf_counter()
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    t["cvtColor"] = time.perf_counter()
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    t["GaussianBlur"] = time.perf_counter()
+    edges = cv2.Canny(gray, 50, 150)
+    t["Canny"] = time.perf_counter()
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    t["findContours"] = time.perf_counter()
+    chosen = wm._select_wall_contour(contours)
+    t["select"] = time.perf_counter()
+    reference = tuple(cv2.boundingRect(max(contours, key=cv2.contourArea))) if contours else None
+    out, prev = {}, start
+    for stage in STAGES:
+        out[stage] = (t[stage] - prev) * 1000.0
+        prev = t[stage]
+    out["contours"] = len(contours)
+    out["selection_ok"] = chosen == reference
+    return out
+
+
+def run_case(size: Tuple[int, int], noise: float, args, rng: np.random.Generator) -> dict:
+    stages: Dict[str, List[float]] = {s: [] for s in STAGES}
+    totals: List[float] = []
+    ious: List[float] = []
+    contours: List[int] = []
+    mismatches = 0
+    peak_mb = 0.0
+    for _ in range(args.images):
+        img, truth = synthetic_wall(size, noise, rng, args.speckle)
+        best = None
+        for _ in range(args.repeat):
+            st = stage_times(img)
+            if best is None or sum(st[s] for s in STAGES) < sum(best[s] for s in STAGES):
+                best = st
+        for s in STAGES:
+            stages[s].append(best[s])
+        contours.append(best["contours"])
+        mismatches += 0 if best["selection_ok"] else 1
+
+        total = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            bbox = wm.find_wall_bbox_front(img, args.max_side)
+            total = min(total, time.perf_counter() - start)
+        totals.append(total * 1000.0)
+        ious.append(iou(bbox, truth))
+
+        tracemalloc.start()
+        wm.find_wall_bbox_front(img, args.max_side)
+        peak_mb = max(peak_mb, tracemalloc.get_traced_memory()[1] / 1e6)
+        tracemalloc.stop()
+
+    mean_total = float(np.mean(totals))
+    return {
+        "width": size[0],
+        "height": size[1],
+        "noise": noise,
+        "images": args.images,
+        "stage_ms": {s: round(float(np.mean(v)), 3) for s, v in stages.items()},
+        "total_ms": round(mean_total, 3),
+        "images_per_s": round(1000.0 / mean_total, 2) if mean_total else None,
+        "peak_traced_mb": round(peak_mb, 2),
+        "contours": int(np.mean(contours)),
+        "selection_mismatches": mismatches,
+        "iou_mean": round(float(np.mean(ious)), 4),
+        "iou_min": round(float(np.min(ious)), 4),
+    }
+
+
+def case_key(case: dict) -> str:
+    return f"{case['width']}x{case['height']}@{case['noise']:g}"
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    cases = []
+    for res in args.resolutions:
+        for noise in args.noise:
+            case = run_case(RESOLUTIONS[res], noise, args, rng)
+            cases.append(case)
+            st = case["stage_ms"]
+            print(f"{case_key(case):>16}: {case['total_ms']:8.2f} ms ({case['images_per_s']:7.1f} img/s)  "
+                  + "  ".join(f"{s} {st[s]:.2f}" for s in STAGES)
+                  + f"  contours {case['contours']} (mismatch {case['selection_mismatches']})"
+                  + f"  IoU {case['iou_mean']:.3f}  peak {case['peak_traced_mb']:.1f} MB")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "machine": platform.machine(),
+        "max_side": args.max_side,
+        "speckle": args.speckle,
+        "seed": args.seed,
+        "cases": cases,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            base = {case_key(c): c for c in json.load(fh)["cases"]}
+        print("\nchange vs baseline (negative time = faster):")
+        for case in cases:
+            old = base.get(case_key(case))
+            if old is None:
+                continue
+            dt = (case["total_ms"] - old["total_ms"]) / old["total_ms"] * 100.0 if old["total_ms"] else 0.0
+            print(f"{case_key(case):>16}: time {dt:+6.1f}%  IoU {case['iou_mean'] - old['iou_mean']:+.4f}")
+
+
+if __name__ == '__main__':
+    main()
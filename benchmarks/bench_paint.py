@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Compare the vectorised px_to_meters_array / estimate_paint_litres_array against a Python loop
+over the scalar functions, and check the results are identical.
+
+Usage:
+    python benchmarks/bench_paint.py --rows 500000
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+import wall_measure as wm  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark scalar vs vectorised paint estimation")
+    p.add_argument("--rows", type=int, default=200_000, help="Number of wall records (default: 200000)")
+    p.add_argument("--repeat", type=int, default=3, help="Timing repetitions, best is reported (default: 3)")
+    p.add_argument("--seed", type=int, default=0)
+    return p.parse_args()
+
+
+def scalar_loop(w_px, h_px, ref_m, ref_px, coverage, coats, round_up):
+    out = []
+    for w, h, rm, rp, cov, co in zip(w_px, h_px, ref_m, ref_px, coverage, coats):
+        width_m = wm.px_to_meters(w, None, (rm, rp))
+        height_m = wm.px_to_meters(h, None, (rm, rp))
+        out.append(wm.estimate_paint_litres(width_m * height_m, cov, co, round_up))
+    return out
+
+
+def vectorised(w_px, h_px, ref_m, ref_px, coverage, coats, round_up):
+    width_m = wm.px_to_meters_array(w_px, ref=(ref_m, ref_px))
+    height_m = wm.px_to_meters_array(h_px, ref=(ref_m, ref_px))
+    return wm.estimate_paint_litres_array(width_m * height_m, coverage, coats, round_up)
+
+
+def best_of(fn, repeat: int, *args) -> tuple:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    n = args.rows
+    arrays = (
+        rng.integers(200, 6000, n).astype(np.float64),   # w_px
+        rng.integers(200, 4000, n).astype(np.float64),   # h_px
+        rng.uniform(0.5, 2.0, n),                        # reference length (m)
+        rng.integers(50, 500, n).astype(np.float64),     # reference length (px)
+        rng.uniform(6.0, 14.0, n),                       # coverage m^2/L
+        rng.integers(1, 4, n).astype(np.float64),        # coats
+    )
+    lists = [a.tolist() for a in arrays]
+
+    print(f"rows: {n}")
+    for round_up in (True, False):
+        t_scalar, scalar = best_of(scalar_loop, args.repeat, *lists, round_up)
+        t_vec, vec = best_of(vectorised, args.repeat, *arrays, round_up)
+        identical = bool(np.array_equal(np.asarray(scalar, dtype=np.float64), vec))
+        print(f"round_up={round_up}: scalar {t_scalar:.3f}s ({n / t_scalar:,.0f} rows/s), "
+              f"vectorised {t_vec:.4f}s ({n / t_vec:,.0f} rows/s), "
+              f"speedup x{t_scalar / t_vec:.1f}, identical={identical}")
+
+
+if __name__ == '__main__':
+    main()
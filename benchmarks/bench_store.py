@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Insert and query benchmark for store.MeasurementStore: adds generated measurement results spread over
+projects and rooms (batched inserts), then times the per-project aggregate queries served by
+/projects and /projects/<project>.
+
+Usage:
+    python benchmarks/bench_store.py
+    python benchmarks/bench_store.py --records 1000000 --projects 500 --batch 256 --keep /tmp/measurements.db
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import shutil
+import random
+import argparse
+import tempfile
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from store import MeasurementStore  # noqa: E402
+
+ROOMS = ("kitchen", "hall", "bedroom", "bath", "living", "stairs", "garage", "facade")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark the SQLite measurement store")
+    p.add_argument("--records", type=int, default=200_000, help="Results to insert (default: 200000)")
+    p.add_argument("--projects", type=int, default=200, help="Distinct projects (default: 200)")
+    p.add_argument("--batch", type=int, default=64, help="Store batch size (default: 64)")
+    p.add_argument("--queries", type=int, default=200, help="Aggregate queries to time (default: 200)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--keep", metavar="FILE", help="Write the database here and keep it (default: a temp file)")
+    return p.parse_args()
+
+
+def sample_result(rng: random.Random) -> dict:
+    w, h = rng.uniform(2.0, 12.0), rng.uniform(2.2, 3.5)
+    return {
+        "width_m": round(w, 3), "height_m": round(h, 3), "depth_m": None, "area_m2": round(w * h, 3),
+        "coverage_m2_per_l": 10.0, "coats": 2.0, "litres": -(-w * h * 2.0 // 10.0),
+        "bbox": {"x_px": 100, "y_px": 80, "w_px": int(w * 200), "h_px": int(h * 200),
+                 "image_w_px": 4000, "image_h_px": 3000},
+        "timing_ms": {"front": 120.0},
+    }
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    workdir = None if args.keep else tempfile.mkdtemp(prefix="bench_store_")
+    path = args.keep or os.path.join(workdir, "measurements.db")
+    store = MeasurementStore(path, args.batch)
+    try:
+        projects = [f"project-{i:05d}" for i in range(args.projects)]
+        start = time.perf_counter()
+        for i in range(args.records):
+            store.add(sample_result(rng), rng.choice(projects), rng.choice(ROOMS), f"{i:032x}",
+                      {"scale": 0.005, "coverage": 10.0, "coats": 2.0})
+        store.flush()
+        elapsed = time.perf_counter() - start
+        print(f"inserted {args.records:,} records in {elapsed:.2f}s ({args.records / elapsed:,.0f}/s, "
+              f"batch {args.batch}), {os.path.getsize(path) / 1e6:.1f} MB")
+
+        timings = []
+        for _ in range(args.queries):
+            start = time.perf_counter()
+            store.project_totals(rng.choice(projects))
+            timings.append((time.perf_counter() - start) * 1000.0)
+        print(f"/projects/<project>: median {statistics.median(timings):.3f} ms, max {max(timings):.3f} ms "
+              f"({args.records // args.projects:,} records per project)")
+        start = time.perf_counter()
+        store.projects()
+        print(f"/projects: {(time.perf_counter() - start) * 1000.0:.1f} ms for {args.projects} projects")
+    finally:
+        store.close()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Time and peak-memory benchmark for tiled detection (tiles.find_wall_bbox_tiled) on generated large
+TIFFs: each size is written tile by tile, then measured in a fresh process tiled and, unless
+--no-whole, decoded whole with cv2.imread + find_wall_bbox_front for comparison. Peak RSS of the tiled
+run should stay flat as the image grows, and both bboxes should agree.
+
+Usage:
+    python benchmarks/bench_tiled.py
+    python benchmarks/bench_tiled.py --sizes 30000x20000 --no-whole --workers 8 --keep /tmp/ortho
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from typing import Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+STORE_TILE = 512
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark tiled wall detection on generated large TIFFs")
+    p.add_argument("--sizes", nargs="+", default=["8000x6000", "16000x12000"], metavar="WxH",
+                   help="Image sizes to generate (default: 8000x6000 16000x12000)")
+    p.add_argument("--max-side", type=int, default=2048, help="Detection copy long edge (default: 2048)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Tile threads (default: CPUs)")
+    p.add_argument("--no-whole", action="store_true", help="Skip the whole-image cv2.imread comparison")
+    p.add_argument("--keep", metavar="DIR", help="Write the images here and keep them (default: a temp dir)")
+    p.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    return p.parse_args()
+
+
+def wall_rect(w: int, h: int) -> Tuple[int, int, int, int]:
+    """Inclusive (x0, y0, x1, y1) of the generated wall."""
+    return w // 8 + 3, h // 7 + 5, w - w // 9 - 11, h - h // 6 - 7
+
+
+def generate_tiff(path: str, w: int, h: int) -> None:
+    """Tiled zlib RGB TIFF of a light wall on a noisy background, written one stored tile at a time."""
+    import tifffile
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 24, (STORE_TILE, STORE_TILE, 1), dtype=np.uint8)
+    x0, y0, x1, y1 = wall_rect(w, h)
+
+    def tiles():
+        for ty in range(0, h, STORE_TILE):
+            for tx in range(0, w, STORE_TILE):
+                tile = np.full((STORE_TILE, STORE_TILE, 3), 80, np.uint8) + noise
+                ys = slice(max(0, y0 - ty), max(0, min(STORE_TILE, y1 + 1 - ty)))
+                xs = slice(max(0, x0 - tx), max(0, min(STORE_TILE, x1 + 1 - tx)))
+                tile[ys, xs] = (205, 200, 195)
+                yield tile
+
+    tifffile.imwrite(path, tiles(), shape=(h, w, 3), dtype=np.uint8, tile=(STORE_TILE, STORE_TILE),
+                     compression="zlib", photometric="rgb")
+
+
+def child(mode: str, path: str, max_side: int, workers: int) -> None:
+    import wall_measure as wm
+    start = time.perf_counter()
+    if mode == "tiled":
+        import tiles
+        bbox, _ = tiles.find_wall_bbox_tiled(path, max_side, workers=workers)
+    else:
+        bbox = wm.find_wall_bbox_front(wm.load_image_cv(path), max_side)
+    print(json.dumps({"bbox": [int(v) for v in bbox], "seconds": time.perf_counter() - start}))
+
+
+def run_child(mode: str, path: str, args: argparse.Namespace) -> Tuple[dict, float]:
+    """Measure ``path`` in a fresh process; returns (its JSON result, peak RSS in MB)."""
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", mode, path,
+           "--max-side", str(args.max_side), "--workers", str(args.workers)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    _, status, usage = os.wait4(proc.pid, 0)
+    out, err = proc.stdout.read().decode(), proc.stderr.read().decode()
+    proc.stdout.close()
+    proc.stderr.close()
+    if status != 0:
+        raise SystemExit(f"{mode} run failed:\n{err}")
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    rss_mb = usage.ru_maxrss / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0)
+    return json.loads(out), rss_mb
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        child(args.child[0], args.child[1], args.max_side, args.workers)
+        return
+    try:
+        import tifffile  # noqa: F401
+    except ImportError:
+        raise SystemExit("this benchmark needs tifffile: pip install tifffile")
+    workdir = args.keep or tempfile.mkdtemp(prefix="bench_tiled_")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        for spec in args.sizes:
+            w, h = (int(v) for v in spec.lower().split("x"))
+            path = os.path.join(workdir, f"wall_{w}x{h}.tif")
+            start = time.perf_counter()
+            generate_tiff(path, w, h)
+            x0, y0, x1, y1 = wall_rect(w, h)
+            print(f"{w}x{h} ({w * h / 1e6:.0f} MP, {os.path.getsize(path) / 1e6:.0f} MB, "
+                  f"generated in {time.perf_counter() - start:.1f}s), wall {[x0, y0, x1 - x0 + 1, y1 - y0 + 1]}")
+            modes = ["tiled"] + ([] if args.no_whole else ["whole"])
+            bboxes = {}
+            for mode in modes:
+                result, rss_mb = run_child(mode, path, args)
+                bboxes[mode] = result["bbox"]
+                print(f"  {mode:>5}: {result['seconds']:6.2f}s, peak RSS {rss_mb:7.1f} MB, bbox {result['bbox']}")
+            if len(bboxes) == 2:
+                print(f"  bboxes {'match' if bboxes['tiled'] == bboxes['whole'] else 'DIFFER'}")
+            if not args.keep:
+                os.remove(path)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Start-up check based on ``python -X importtime``: non-measuring invocations must not import cv2 or numpy
+and must start within a wall-clock budget. Exits non-zero on failure so it can gate CI.
+
+Usage:
+    python benchmarks/check_startup.py               # default 100 ms budget for the CLI cases
+    python benchmarks/check_startup.py --budget-ms 150 --top 10
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import argparse
+import subprocess
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that must stay unloaded until an image is actually measured
+HEAVY = ("cv2", "numpy")
+
+# (label, argv after the interpreter, held to the budget)
+CASES = (
+    ("wall_measure --help", ["wall_measure.py", "--help"], True),
+    ("wall_measure --version", ["wall_measure.py", "--version"], True),
+    ("import wall_measure", ["-c", "import wall_measure"], True),
+    ("import server", ["-c", "import server"], False),
+)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Check cold-start time and deferred imports")
+    p.add_argument("--budget-ms", type=float, default=100.0, help="Wall-clock budget per CLI case (default: 100)")
+    p.add_argument("--runs", type=int, default=5, help="Runs per case, best is reported (default: 5)")
+    p.add_argument("--top", type=int, default=5, help="Show the N slowest imports per case (default: 5)")
+    return p.parse_args()
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Map module name -> (self us, cumulative us) from ``-X importtime`` output."""
+    out = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            out[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return out
+
+
+def run_case(argv: List[str], runs: int) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    best = float("inf")
+    imports: Dict[str, Tuple[int, int]] = {}
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime"] + argv, cwd=ROOT,
+                              capture_output=True, text=True)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        if proc.returncode != 0:
+            raise SystemExit(f"{' '.join(argv)} failed:\n{proc.stderr}")
+        if elapsed < best:
+            best, imports = elapsed, parse_importtime(proc.stderr)
+    return best, imports
+
+
+def main():
+    args = parse_args()
+    failures = []
+    for label, argv, budgeted in CASES:
+        elapsed, imports = run_case(argv, args.runs)
+        heavy = sorted(m for m in HEAVY if m in imports)
+        over = budgeted and elapsed > args.budget_ms
+        status = "FAIL" if heavy or over else "ok"
+        budget = f" (budget {args.budget_ms:.0f} ms)" if budgeted else ""
+        print(f"[{status}] {label}: {elapsed:.1f} ms{budget}, {len(imports)} modules imported")
+        for name, (_, cumulative) in sorted(imports.items(), key=lambda kv: -kv[1][1])[:args.top]:
+            print(f"        {cumulative / 1000.0:8.1f} ms  {name}")
+        if heavy:
+            failures.append(f"{label} imported {', '.join(heavy)}")
+        if over:
+            failures.append(f"{label} took {elapsed:.1f} ms > {args.budget_ms:.0f} ms")
+    if failures:
+        print("\n" + "\n".join(failures))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Minimal load generator for POST /measure: sends the same image from N concurrent clients and reports
+requests per second and latency percentiles. Compare the dev server with the production setup:
+
+    python server.py                                  # dev server
+    gunicorn -c gunicorn.conf.py wsgi:app             # production
+    python benchmarks/loadtest.py --url http://127.0.0.1:5000/measure --requests 200 --concurrency 16
+"""
+from __future__ import annotations
+import sys
+import time
+import uuid
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Load-test the /measure endpoint")
+    p.add_argument("--url", default="http://127.0.0.1:5000/measure")
+    p.add_argument("--image", help="Front image to upload (default: a synthetic 2000x1500 wall)")
+    p.add_argument("--requests", type=int, default=100, help="Total requests (default: 100)")
+    p.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (default: 8)")
+    p.add_argument("--scale", default="0.005", help="scale form field sent with each request")
+    return p.parse_args()
+
+
+def synthetic_jpeg() -> bytes:
+    import cv2
+    import numpy as np
+    img = np.full((1500, 2000, 3), 205, np.uint8)
+    cv2.rectangle(img, (250, 200), (1750, 1300), (70, 80, 90), -1)
+    ok, buf = cv2.imencode(".jpg", img)
+    return buf.tobytes()
+
+
+def multipart(fields: dict, files: dict) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts: List[bytes] = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, data) in files.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/octet-stream\r\n\r\n'.encode() + data + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def main():
+    args = parse_args()
+    if args.image:
+        with open(args.image, 'rb') as fh:
+            image = fh.read()
+    else:
+        image = synthetic_jpeg()
+    body, content_type = multipart({'scale': args.scale}, {'front': ('front.jpg', image)})
+
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        req = urllib.request.Request(args.url, data=body, headers={'Content-Type': content_type}, method='POST')
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=120) as resp:
+                resp.read()
+                ok = resp.status == 200
+        except (urllib.error.URLError, OSError):
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            errors += 0 if ok else 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, range(args.requests)))
+    total = time.perf_counter() - start
+
+    latencies.sort()
+
+    def pct(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000.0
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, image {len(image) / 1024:.0f} KB")
+    print(f"throughput: {args.requests / total:.1f} req/s ({errors} errors) in {total:.2f}s")
+    print(f"latency ms: p50 {pct(0.50):.1f}  p95 {pct(0.95):.1f}  p99 {pct(0.99):.1f}  max {latencies[-1] * 1000:.1f}")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Re-price stored wall measurements in bulk: read a CSV or Parquet table in fixed-size chunks, convert
+pixel sizes to metres and estimate paint per product line with the vectorised
+``wall_measure.px_to_meters_array`` / ``estimate_paint_litres_array``, and write the enriched table.
+Memory stays bounded by the chunk size, whatever the file size.
+
+Input columns (the CSV written by ``wall_measure.py --batch`` works as is):
+- ``w_px``, ``h_px`` with ``--scale`` / ``--ref`` or per-row ``scale`` or ``ref_m`` + ``ref_px`` columns, or
+- ``area_m2`` when the sizes are already in metres.
+Rows that cannot be priced (empty or non-numeric values) get empty outputs.
+
+Usage:
+    python bulk_pricing.py walls.csv priced.csv --scale 0.005
+    python bulk_pricing.py walls.parquet priced.parquet --product standard:10:2 --product premium:12:1
+"""
+from __future__ import annotations
+import os
+import sys
+import csv
+import time
+import argparse
+import itertools
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import wall_measure as wm
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+# (column name, coverage m^2/L, coats)
+Product = Tuple[str, float, float]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Re-price wall measurements stored in CSV or Parquet files")
+    p.add_argument("src", help="Input .csv or .parquet file")
+    p.add_argument("dst", help="Output file, written in the input's format")
+    scale = p.add_mutually_exclusive_group(required=False)
+    scale.add_argument("--scale", type=float, help="Meters per pixel for every row (else per-row columns are used)")
+    scale.add_argument("--ref", nargs=2, type=float, metavar=("REAL_M", "PX"),
+                       help="Reference real-world length (meters) and its pixel length, for every row")
+    p.add_argument("--coverage", type=float, default=10.0, help="Paint coverage in m^2 per litre (default: 10)")
+    p.add_argument("--coats", type=float, default=2.0, help="Number of coats (default: 2)")
+    p.add_argument("--product", action="append", default=[], metavar="NAME:COVERAGE:COATS",
+                   help="Price a product line into a litres_NAME column; repeatable (replaces --coverage/--coats)")
+    p.add_argument("--no-round", dest="round_up", action="store_false",
+                   help="Do not round litres up to whole litres (default is to round up)")
+    p.add_argument("--chunk-rows", type=int, default=100_000, help="Rows per chunk (default: 100000)")
+    args = p.parse_args()
+    if args.chunk_rows < 1:
+        p.error("--chunk-rows must be at least 1")
+    try:
+        args.products = [parse_product(spec) for spec in args.product]
+    except ValueError as ex:
+        p.error(str(ex))
+    if not args.products:
+        args.products = [("litres", args.coverage, args.coats)]
+    return args
+
+
+def parse_product(spec: str) -> Product:
+    """'NAME:COVERAGE:COATS' -> ('litres_NAME', coverage, coats)."""
+    parts = spec.split(":")
+    if len(parts) != 3 or not parts[0]:
+        raise ValueError(f"product must be NAME:COVERAGE:COATS, got {spec!r}")
+    try:
+        return f"litres_{parts[0]}", float(parts[1]), float(parts[2])
+    except ValueError:
+        raise ValueError(f"product must be NAME:COVERAGE:COATS, got {spec!r}") from None
+
+
+def price_columns(columns: Dict[str, "object"], products: Sequence[Product], scale: Optional[float] = None,
+                  ref: Optional[Tuple[float, float]] = None, round_up: bool = True) -> Dict[str, "object"]:
+    """Price one chunk. ``columns`` maps input column names to float64 arrays (NaN = missing).
+    Returns new float64 arrays: width_m, height_m and area_m2 when computed from pixels, plus one
+    litres column per product; rows that cannot be priced are NaN.
+    """
+    import numpy as np
+    out = {}
+    if "w_px" in columns and "h_px" in columns and (scale is not None or ref is not None or "scale" in columns
+                                                   or ("ref_m" in columns and "ref_px" in columns)):
+        if scale is None and ref is None:
+            if "scale" in columns:
+                scale = columns["scale"]
+            else:
+                ref = (columns["ref_m"], columns["ref_px"])
+                # a zero reference length makes that row unpriceable, not the whole file
+                ref = (ref[0], np.where(ref[1] == 0, np.nan, ref[1]))
+        width_m = wm.px_to_meters_array(columns["w_px"], scale, ref)
+        height_m = wm.px_to_meters_array(columns["h_px"], scale, ref)
+        area_m2 = width_m * height_m
+        # rounded like the scalar results of wall_measure.py, so CLI and bulk values agree
+        out.update(width_m=wm._round_array(width_m, 3), height_m=wm._round_array(height_m, 3),
+                   area_m2=wm._round_array(area_m2, 3))
+    elif "area_m2" in columns:
+        area_m2 = columns["area_m2"]
+    else:
+        raise ValueError("need w_px and h_px with a scale/ref (argument or columns), or an area_m2 column")
+
+    valid = np.isfinite(area_m2)
+    for name, coverage, coats in products:
+        litres = np.full(area_m2.shape, np.nan)
+        litres[valid] = wm.estimate_paint_litres_array(area_m2[valid], coverage, coats, round_up)
+        out[name] = litres
+    return out
+
+
+def input_columns(header: Sequence[str]) -> List[str]:
+    """The input columns ``price_columns`` may read."""
+    return [c for c in ("w_px", "h_px", "scale", "ref_m", "ref_px", "area_m2") if c in header]
+
+
+def _to_float(values: Sequence[str]):
+    """CSV strings -> float64 array; empty or non-numeric values become NaN."""
+    import numpy as np
+    try:
+        return np.fromiter(map(float, values), dtype=np.float64, count=len(values))
+    except ValueError:
+        pass
+    try:
+        return np.array([float(v) if v else np.nan for v in values], dtype=np.float64)
+    except ValueError:
+        return np.array([_parse_float(v) for v in values], dtype=np.float64)
+
+
+def _parse_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return float("nan")
+
+
+def _format(values, whole: bool) -> List[str]:
+    """float64 array -> CSV strings as the scalar code prints them ('' for NaN)."""
+    import numpy as np
+    missing = np.isnan(values)
+    if whole:
+        text = list(map(str, np.where(missing, 0, values).astype(np.int64).tolist()))
+    else:
+        text = list(map(str, values.tolist()))
+    if missing.any():
+        for i in np.flatnonzero(missing).tolist():
+            text[i] = ""
+    return text
+
+
+def price_csv(src: str, dst: str, products: Sequence[Product], scale: Optional[float] = None,
+              ref: Optional[Tuple[float, float]] = None, round_up: bool = True, chunk_rows: int = 100_000) -> int:
+    """Price ``src`` into ``dst`` chunk by chunk; returns the number of data rows.
+    Each chunk is transposed into columns so parsing, pricing and formatting run column-wise.
+    """
+    rows = 0
+    with open(src, "r", newline="", encoding="utf-8") as fin, open(dst, "w", newline="", encoding="utf-8") as fout:
+        reader = csv.reader(fin)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError(f"{src} is empty")
+        width = len(header)
+        used = {name: header.index(name) for name in input_columns(header)}
+        writer = csv.writer(fout)
+        out_header = None
+        whole = {name for name, _, _ in products} if round_up else set()
+        while True:
+            chunk = list(itertools.islice(reader, chunk_rows))
+            if not chunk:
+                break
+            if any(len(r) != width for r in chunk):
+                chunk = [(r + [""] * (width - len(r)))[:width] for r in chunk]
+            columns = list(zip(*chunk))
+            priced = price_columns({name: _to_float(columns[i]) for name, i in used.items()},
+                                   products, scale, ref, round_up)
+            if out_header is None:
+                # priced columns overwrite same-named input columns, new ones are appended
+                out_header = list(header) + [name for name in priced if name not in header]
+                writer.writerow(out_header)
+            columns.extend([()] * (len(out_header) - width))
+            for name, values in priced.items():
+                columns[out_header.index(name)] = _format(values, name in whole)
+            writer.writerows(zip(*columns))
+            rows += len(chunk)
+        if out_header is None:
+            writer.writerow(header)
+    return rows
+
+
+def price_parquet(src: str, dst: str, products: Sequence[Product], scale: Optional[float] = None,
+                  ref: Optional[Tuple[float, float]] = None, round_up: bool = True,
+                  chunk_rows: int = 100_000) -> int:
+    """Parquet version of ``price_csv`` (needs pyarrow): record batches in, record batches out."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet files need pyarrow: pip install pyarrow") from None
+    import numpy as np
+    rows = 0
+    source = pq.ParquetFile(src)
+    writer = None
+    try:
+        for batch in source.iter_batches(batch_size=chunk_rows):
+            names = batch.schema.names
+            columns = {name: np.asarray(batch.column(name).cast(pa.float64()).to_numpy(zero_copy_only=False),
+                                        dtype=np.float64)
+                       for name in input_columns(names)}
+            priced = price_columns(columns, products, scale, ref, round_up)
+            arrays = dict(zip(names, batch.columns))
+            for name, values in priced.items():
+                arrays[name] = pa.array(values, from_pandas=True)  # NaN -> null
+            table = pa.Table.from_pydict(arrays)
+            if writer is None:
+                writer = pq.ParquetWriter(dst, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def price_file(src: str, dst: str, products: Sequence[Product], scale: Optional[float] = None,
+               ref: Optional[Tuple[float, float]] = None, round_up: bool = True, chunk_rows: int = 100_000) -> int:
+    """``price_parquet`` for .parquet/.pq inputs, ``price_csv`` otherwise."""
+    fn = price_parquet if src.lower().endswith(PARQUET_EXTENSIONS) else price_csv
+    return fn(src, dst, products, scale, ref, round_up, chunk_rows)
+
+
+def main():
+    args = parse_args()
+    ref = tuple(args.ref) if args.ref else None
+    start = time.perf_counter()
+    try:
+        rows = price_file(args.src, args.dst, args.products, args.scale, ref, args.round_up, args.chunk_rows)
+    except (OSError, ValueError, RuntimeError, ZeroDivisionError) as ex:
+        print("ERROR:", ex, file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    rate = rows / elapsed if elapsed > 0 else float("inf")
+    print(f"Priced {rows} rows in {elapsed:.2f}s: {rate:,.0f} rows/s ({os.path.basename(args.dst)})", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
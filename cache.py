@@ -0,0 +1,139 @@
+"""
+Small thread-safe LRU cache with optional TTL and SQLite persistence, used by the web server to
+skip repeated work (decoding + wall detection of an image that was already uploaded, AI summaries
+of near-identical measurements).
+
+Values must be JSON-serialisable when a persistence path is given.
+"""
+from __future__ import annotations
+import json
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# prune the on-disk table back to max_size after this many writes
+_PRUNE_EVERY = 64
+# seconds to wait for another process's write lock; a cache read or write that cannot get it is skipped
+_BUSY_TIMEOUT = 2.0
+
+log = logging.getLogger(__name__)
+
+
+def content_hash(data: bytes) -> str:
+    """Fast, collision-resistant hex digest of raw bytes (BLAKE2b, 128-bit)."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class LRUCache:
+    """Bounded least-recently-used mapping of str keys to values.
+
+    When ``path`` is given, entries are also written to a SQLite table so a restarted process
+    starts warm; entries missing from memory are looked up there and promoted. With ``ttl``
+    (seconds) entries older than that are treated as missing. The database is opened on first use,
+    so a cache created before a pre-fork server forks gets one connection per worker; it runs in WAL
+    mode, and database errors (e.g. a lock held too long by another worker) are logged, not raised.
+    """
+
+    def __init__(self, max_size: int = 256, path: Optional[str] = None, table: str = "cache",
+                 ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # key -> (value, created timestamp)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._table = table
+        self._writes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self._expired(entry[1], now):
+                del self._data[key]
+                entry = None
+            if entry is None:
+                entry = self._db_get(key, now)
+                if entry is None:
+                    self.misses += 1
+                    return None
+                self._remember(key, entry)
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, (value, now))
+            try:
+                if self._connect() is None:
+                    return
+                with self._db:
+                    self._db.execute(
+                        f"INSERT OR REPLACE INTO {self._table} (key, value, used, created) VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(value), now, now),
+                    )
+                    self._writes += 1
+                    if self._writes % _PRUNE_EVERY == 0:
+                        self._db.execute(
+                            f"DELETE FROM {self._table} WHERE key NOT IN "
+                            f"(SELECT key FROM {self._table} ORDER BY used DESC LIMIT ?)",
+                            (self.max_size,),
+                        )
+            except sqlite3.Error as e:
+                log.warning("%s cache: skipped writing %s to %s: %s", self._table, key, self._path, e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._data), "max_size": self.max_size, "ttl": self.ttl,
+                "hits": self.hits, "misses": self.misses}
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._db is None and self._path:
+            db = sqlite3.connect(self._path, timeout=_BUSY_TIMEOUT, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            table = self._table
+            db.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, used REAL NOT NULL, created REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in db.execute(f"PRAGMA table_info({table})")}
+            if "created" not in columns:
+                # table written before TTL support
+                db.execute(f"ALTER TABLE {table} ADD COLUMN created REAL NOT NULL DEFAULT 0")
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _db_get(self, key: str, now: float) -> Optional[tuple]:
+        try:
+            if self._connect() is None:
+                return None
+            row = self._db.execute(f"SELECT value, created FROM {self._table} WHERE key = ?", (key,)).fetchone()
+            if row is None or self._expired(row[1], now):
+                return None
+            with self._db:
+                self._db.execute(f"UPDATE {self._table} SET used = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            log.warning("%s cache: skipped reading %s from %s: %s", self._table, key, self._path, e)
+            return None
+        return json.loads(row[0]), row[1]
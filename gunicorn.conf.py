@@ -0,0 +1,37 @@
+"""
+gunicorn settings for the measurement server; every value can be overridden from the environment.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import os
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+# worker processes (CPU-bound detection) x threads per worker (overlap uploads and AI calls)
+workers = int(os.environ.get('WEB_WORKERS', os.cpu_count() or 2))
+threads = int(os.environ.get('WEB_THREADS', '4'))
+worker_class = 'gthread'
+# import cv2/numpy/app once in the master before forking workers
+preload_app = True
+timeout = int(os.environ.get('WEB_TIMEOUT', '60'))
+# on SIGTERM workers get this long to finish in-flight requests
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+# recycle workers now and then to bound memory growth from fragmentation
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', '2000'))
+max_requests_jitter = max_requests // 10
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    # OpenCV's own threads would oversubscribe CPUs already split across worker processes
+    import cv2
+    cv2.setNumThreads(max(1, (os.cpu_count() or 1) // workers))
+    # run (and resume) queued /jobs and AI summaries in every worker
+    import server as measure_server
+    measure_server.job_queue.start()
+    measure_server.summary_queue.start()
+
+
+def worker_exit(server, worker):
+    import server as measure_server
+    measure_server.shutdown(wait_for_jobs=False)
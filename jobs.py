@@ -0,0 +1,322 @@
+"""
+Persistent queue of background jobs run on a bounded local thread pool, behind the web server's
+``POST /jobs`` / ``GET /jobs/<id>`` measurements and its ``/summary/<id>`` AI summaries.
+
+Jobs (form fields plus the uploaded files, spooled to disk) are rows of a SQLite table, so queued jobs
+survive a restart. A running job holds a lease that its process renews every ``lease / 4`` seconds; a job
+whose lease has run out (its process died or hangs, on this host or another) is queued again, and on this
+host a job of a process that has exited is queued again at once. Several
+server processes may share one database: claiming the next job is a ``BEGIN IMMEDIATE`` transaction,
+so each job runs once. Without a database path the queue lives in memory for this process only, which
+suits a single process (tests, scripts) but not a pre-fork server: each worker would see only its own jobs.
+"""
+from __future__ import annotations
+import os
+import json
+import logging
+import shutil
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS {table} ("
+    "id TEXT PRIMARY KEY, status TEXT NOT NULL, created REAL NOT NULL, started REAL, finished REAL, "
+    "owner TEXT, heartbeat REAL, form TEXT NOT NULL, files TEXT NOT NULL, result TEXT, error TEXT)",
+    "CREATE INDEX IF NOT EXISTS {table}_status_created ON {table} (status, created)",
+)
+# requeue jobs of dead processes and drop expired ones at most this often (seconds)
+_HOUSEKEEPING_EVERY = 30.0
+
+log = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """Raised by ``JobQueue.submit`` when ``max_queued`` jobs are already waiting."""
+
+
+class JobQueue:
+    """Queue of jobs handled by ``handler(form, files)``: ``form`` is a dict of form fields and ``files``
+    maps field names to spooled file paths. Its return value (JSON-serialisable) becomes the job result,
+    and an exception marks the job failed with its message.
+
+    Queues of different handlers may share one database under different ``table`` names.
+    ``workers`` threads run jobs. They are started by ``start()`` (or the first submit/status call), so a
+    queue created before a pre-fork server forks runs in each worker process.
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, str], Dict[str, str]], Any], path: Optional[str] = None,
+                 spool_dir: Optional[str] = None, workers: int = 2, max_queued: int = 1000,
+                 ttl: float = 86400.0, poll_interval: float = 1.0, table: str = "jobs", lease: float = 60.0):
+        self.handler = handler
+        self.path = path
+        self.table = table
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.lease = lease
+        if spool_dir is None:
+            spool_dir = f"{path}.files" if path else tempfile.mkdtemp(prefix="wall_jobs_")
+        self.spool_dir = spool_dir
+        self._lock = threading.Lock()       # guards the connection
+        self._cond = threading.Condition()  # wakes idle workers and status waiters
+        self._db: Optional[sqlite3.Connection] = None
+        self._threads = []
+        self._pid = None
+        self._token = uuid.uuid4().hex[:8]  # tells this process's jobs from those of an earlier one with its pid
+        self._stopping = False
+        self._housekeeping = 0.0
+
+    @property
+    def owner(self) -> str:
+        return f"{socket.gethostname()}:{os.getpid()}:{self._token}"
+
+    def start(self) -> None:
+        """Start the worker threads of this process (again after a fork) and requeue orphaned jobs."""
+        with self._cond:
+            if self._pid == os.getpid() or self._stopping:
+                return
+            self._pid = os.getpid()
+            # a connection or threads inherited through fork are unusable here
+            self._db = None
+            self._token = uuid.uuid4().hex[:8]
+            self._threads = [threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                             for i in range(self.workers)]
+            self._threads.append(threading.Thread(target=self._renew_leases, name="job-lease", daemon=True))
+        self._housekeep(force=True)
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, form: Dict[str, str], files: Dict[str, Any]) -> str:
+        """Queue a job; ``files`` maps field names to uploads (anything with ``save(path)``), which are
+        copied to the spool directory. Returns the job id; raises ``QueueFull``.
+        """
+        self.start()
+        with self._lock:
+            queued = self._connect().execute(
+                f"SELECT COUNT(*) FROM {self.table} WHERE status = 'queued'").fetchone()[0]
+        if queued >= self.max_queued:
+            raise QueueFull(f"{queued} jobs are already queued")
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.spool_dir, job_id)
+        os.makedirs(job_dir)
+        paths = {}
+        try:
+            for name, upload in files.items():
+                paths[name] = os.path.join(job_dir, name)
+                upload.save(paths[name])
+            with self._lock:
+                db = self._connect()
+                with db:
+                    db.execute(f"INSERT INTO {self.table} (id, status, created, form, files) "
+                               "VALUES (?, 'queued', ?, ?, ?)",
+                               (job_id, time.time(), json.dumps(form), json.dumps(paths)))
+        except BaseException:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+        with self._cond:
+            self._cond.notify_all()
+        return job_id
+
+    def status(self, job_id: str, wait: float = 0.0) -> Optional[Dict[str, Any]]:
+        """{'id', 'status' (queued/running/done/failed), timestamps, 'result' or 'error', and for a queued job
+        its 'position'}; None for an unknown id. Waits up to ``wait`` seconds for the job to finish.
+        """
+        self.start()
+        deadline = time.time() + wait
+        while True:
+            job = self._fetch(job_id)
+            remaining = deadline - time.time()
+            if job is None or job["status"] in ("done", "failed") or remaining <= 0:
+                return job
+            with self._cond:
+                # woken by jobs finishing here; jobs run by another process are seen on the next poll
+                self._cond.wait(min(remaining, self.poll_interval))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._connect().execute(f"SELECT status, COUNT(*) FROM {self.table} GROUP BY status").fetchall()
+        return {"workers": self.workers, "max_queued": self.max_queued, **{status: n for status, n in rows}}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop taking jobs. With ``wait`` the running ones finish first; otherwise they are queued again
+        the next time a server process starts.
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _fetch(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            db = self._connect()
+            row = db.execute(f"SELECT id, status, created, started, finished, result, error FROM {self.table} "
+                             "WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = dict(zip(("id", "status", "created", "started", "finished", "result", "error"), row))
+            if job["status"] == "queued":
+                job["position"] = db.execute(f"SELECT COUNT(*) FROM {self.table} "
+                                             "WHERE status = 'queued' AND created < ?",
+                                             (job["created"],)).fetchone()[0]
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+            try:
+                job = self._claim()
+                if job is None:
+                    self._housekeep()
+            except sqlite3.Error as e:
+                # e.g. locked by another process past the busy timeout: keep the thread, try again later
+                log.warning("%s queue: %s", self.table, e)
+                job = None
+            if job is None:
+                self._idle()
+                continue
+            job_id, form, files = job
+            try:
+                result, error = self.handler(form, files), None
+            except Exception as ex:
+                result, error = None, str(ex) or type(ex).__name__
+            while True:
+                try:
+                    self._finish(job_id, result, error)
+                    break
+                except sqlite3.Error as e:
+                    log.warning("%s queue: could not record job %s: %s", self.table, job_id, e)
+                    if not self._idle():
+                        # left running; queued again once this process is gone
+                        return
+            shutil.rmtree(os.path.join(self.spool_dir, job_id), ignore_errors=True)
+
+    def _renew_leases(self) -> None:
+        """Extend the lease of this process's running jobs every ``lease / 4`` seconds, and housekeep."""
+        while True:
+            renew_at = time.time() + self.lease / 4.0
+            with self._cond:
+                # other notifications (jobs submitted or finished) do not renew early
+                while not self._stopping and time.time() < renew_at:
+                    self._cond.wait(renew_at - time.time())
+                if self._stopping:
+                    return
+            try:
+                with self._lock:
+                    db = self._connect()
+                    with db:
+                        db.execute(f"UPDATE {self.table} SET heartbeat = ? WHERE owner = ? AND status = 'running'",
+                                   (time.time(), self.owner))
+                self._housekeep()
+            except sqlite3.Error as e:
+                log.warning("%s queue: could not renew leases: %s", self.table, e)
+
+    def _idle(self) -> bool:
+        """Wait up to ``poll_interval`` for work; False once the queue is stopping."""
+        with self._cond:
+            if not self._stopping:
+                self._cond.wait(self.poll_interval)
+            return not self._stopping
+
+    def _claim(self) -> Optional[tuple]:
+        """Mark the oldest queued job running (owned by this process) and return (id, form, files)."""
+        with self._lock:
+            db = self._connect()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(f"SELECT id, form, files FROM {self.table} WHERE status = 'queued' "
+                                 "ORDER BY created LIMIT 1").fetchone()
+                if row is not None:
+                    now = time.time()
+                    db.execute(f"UPDATE {self.table} SET status = 'running', started = ?, heartbeat = ?, owner = ? "
+                               "WHERE id = ?", (now, now, self.owner, row[0]))
+                db.commit()
+            except BaseException:
+                db.rollback()
+                raise
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), json.loads(row[2])
+
+    def _finish(self, job_id: str, result: Any, error: Optional[str]) -> None:
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.execute(f"UPDATE {self.table} SET status = ?, finished = ?, result = ?, error = ? WHERE id = ?",
+                           ("failed" if error is not None else "done", time.time(),
+                            json.dumps(result) if error is None else None, error, job_id))
+        with self._cond:
+            self._cond.notify_all()
+
+    def _housekeep(self, force: bool = False) -> None:
+        """Requeue running jobs whose lease ran out or whose process is gone and delete finished jobs older
+        than ``ttl``.
+        """
+        now = time.time()
+        with self._lock:
+            if not force and now - self._housekeeping < _HOUSEKEEPING_EVERY:
+                return
+            self._housekeeping = now
+            db = self._connect()
+            orphans = [job_id for job_id, owner, heartbeat in db.execute(
+                f"SELECT id, owner, COALESCE(heartbeat, started) FROM {self.table} "
+                "WHERE status = 'running'")
+                if heartbeat is None or heartbeat < now - self.lease or not self._owner_alive(owner)]
+            expired = [row[0] for row in db.execute(
+                f"SELECT id FROM {self.table} WHERE status IN ('done', 'failed') AND finished < ?", (now - self.ttl,))]
+            with db:
+                db.executemany(f"UPDATE {self.table} SET status = 'queued', started = NULL, heartbeat = NULL, "
+                               "owner = NULL WHERE id = ? AND status = 'running'", [(job_id,) for job_id in orphans])
+                db.executemany(f"DELETE FROM {self.table} WHERE id = ?", [(job_id,) for job_id in expired])
+        for job_id in expired:
+            shutil.rmtree(os.path.join(self.spool_dir, job_id), ignore_errors=True)
+        if orphans:
+            with self._cond:
+                self._cond.notify_all()
+
+    def _owner_alive(self, owner: Optional[str]) -> bool:
+        """Whether the process named by a job's ``owner`` (host:pid:token) still runs. Processes on other
+        hosts cannot be checked and count as alive; their jobs are requeued when the lease runs out.
+        """
+        if not owner:
+            return False
+        host, pid, token = owner.rsplit(":", 2)
+        if host != socket.gethostname():
+            return True
+        if int(pid) == os.getpid():
+            return token == self._token
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            if self.path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            db = sqlite3.connect(self.path or ":memory:", timeout=30.0, check_same_thread=False)
+            if self.path:
+                db.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                db.execute(statement.format(table=self.table))
+            columns = {row[1] for row in db.execute(f"PRAGMA table_info({self.table})")}
+            if "heartbeat" not in columns:
+                # table written before leases
+                db.execute(f"ALTER TABLE {self.table} ADD COLUMN heartbeat REAL")
+            db.commit()
+            self._db = db
+        return self._db
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Long-running measurement daemon for the wall_measure CLI.
+
+Keeps cv2 imported and a pool of worker processes warm, listening on a Unix domain socket. While it runs,
+``wall_measure.py --front ... --scale ...`` forwards its measurement here instead of paying interpreter
+start-up and cv2 initialisation on every call; without it the CLI measures in-process as before.
+
+Protocol: one JSON object per line in each direction.
+    {"op": "ping"}                                   -> {"ok": true, "version": "..."}
+    {"op": "measure", "front": "/abs/front.jpg", "top": null, "scale": 0.005, "ref": null,
+     "coverage": 10.0, "coats": 2.0, "round_up": true, "max_side": null, "reduce": 1}
+                                                     -> {"ok": true, "result": {...}} or {"ok": false, "error": "..."}
+A failed measure reply carries "kind" ("value" or "os") when the input was at fault, so the CLI reports it
+exactly as it would have in-process.
+
+Usage:
+    python measure_daemon.py --jobs 4 &
+    python wall_measure.py --front front.jpg --scale 0.005
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import signal
+import socket
+import argparse
+import threading
+import socketserver
+import multiprocessing
+
+import wall_measure as wm
+
+# keys of a measure request passed through to wall_measure.measure_views
+MEASURE_FIELDS = ("front", "top", "scale", "ref", "coverage", "coats", "round_up", "max_side", "reduce",
+                  "openings", "perspective", "side", "marker_m", "checkerboard", "aruco_dict",
+                  "tiled", "workers")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Serve wall measurements over a Unix socket with warm workers")
+    p.add_argument("--socket", default=None, help="Socket path (default: $WALL_MEASURE_SOCKET or a per-user temp path)")
+    p.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes (default: number of CPUs)")
+    return p.parse_args()
+
+
+def _measure(request: dict) -> dict:
+    try:
+        kwargs = {k: request[k] for k in MEASURE_FIELDS if request.get(k) is not None}
+        if "ref" in kwargs:
+            kwargs["ref"] = tuple(kwargs["ref"])
+        return {"ok": True, "result": wm.measure_views(**kwargs)}
+    except wm.INPUT_ERRORS as ex:
+        return {"ok": False, "error": str(ex), "kind": wm._error_kind(ex)}
+    except Exception as ex:
+        return {"ok": False, "error": f"{type(ex).__name__}: {ex}"}
+
+
+class MeasureHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except ValueError:
+            reply = {"ok": False, "error": "request is not valid JSON"}
+        else:
+            op = request.get("op")
+            if op == "ping":
+                reply = {"ok": True, "version": wm.__version__}
+            elif op == "measure":
+                reply = self.server.pool.apply(_measure, (request,))
+            else:
+                reply = {"ok": False, "error": f"unknown op: {op!r}"}
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+class MeasureServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, pool):
+        self.pool = pool
+        super().__init__(path, MeasureHandler)
+
+
+def claim_socket(path: str) -> None:
+    """Remove a stale socket file left by a crashed daemon; refuse to start if one is still serving."""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise SystemExit(f"A measurement daemon is already listening on {path}")
+
+
+def main():
+    args = parse_args()
+    if not hasattr(socket, "AF_UNIX"):
+        raise SystemExit("Unix domain sockets are not available on this platform")
+    path = args.socket or wm.default_socket_path()
+    claim_socket(path)
+
+    pool = multiprocessing.Pool(processes=max(1, args.jobs), initializer=wm._batch_worker_init)
+    # bind with the socket already private (0600) rather than chmod it afterwards, which leaves it reachable
+    # with the umask's permissions for a moment
+    old_umask = os.umask(0o177)
+    try:
+        server = MeasureServer(path, pool)
+    finally:
+        os.umask(old_umask)
+
+    def stop(signum, frame):
+        # shutdown() blocks until serve_forever returns, so call it off the main thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"wall_measure daemon {wm.__version__} listening on {path} with {args.jobs} worker(s)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        pool.close()
+        pool.join()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,133 @@
-from flask import Flask, request, jsonify, send_from_directory, render_template
-import numpy as np
-import cv2
+from __future__ import annotations
+from flask import Flask, Request, Response, request, jsonify, render_template
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
+import io
 import os
-from typing import Optional, Tuple
+import atexit
+import json
+import math
+import mmap
+import time
+import zipfile
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional, Tuple
 
+# numpy/cv2 are imported where first used so the module (and --help style tooling) starts fast;
+# wsgi.py preloads them before forking workers
+if TYPE_CHECKING:
+    import numpy as np
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+import metrics
 import wall_measure as wm
+from cache import LRUCache, content_hash
+from store import MeasurementStore
+from jobs import JobQueue, QueueFull
 
 # Optional OpenAI integration
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
 OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-4o-mini')
+# 'openai' calls the API; 'mock' returns a canned summary after OPENAI_MOCK_DELAY seconds (local testing)
+OPENAI_BACKEND = os.environ.get('OPENAI_BACKEND', 'openai')
+OPENAI_MOCK_DELAY = float(os.environ.get('OPENAI_MOCK_DELAY', '0.5'))
+OPENAI_TIMEOUT = float(os.environ.get('OPENAI_TIMEOUT', '20'))  # seconds per summary call
+OPENAI_CONCURRENCY = int(os.environ.get('OPENAI_CONCURRENCY', '4'))  # summary calls in flight at once
+SUMMARY_JOB_TTL = float(os.environ.get('SUMMARY_JOB_TTL', '600'))  # seconds a finished summary stays fetchable
+
+# Summaries are reused for measurements that agree after rounding to these buckets
+SUMMARY_BUCKET_M = float(os.environ.get('SUMMARY_BUCKET_M', '0.1'))     # width/height/depth
+SUMMARY_BUCKET_M2 = float(os.environ.get('SUMMARY_BUCKET_M2', '0.5'))   # area
+SUMMARY_BUCKET_L = float(os.environ.get('SUMMARY_BUCKET_L', '1.0'))     # litres
+SUMMARY_CACHE_SIZE = int(os.environ.get('SUMMARY_CACHE_SIZE', '1024'))  # 0 disables the summary cache
+SUMMARY_CACHE_TTL = float(os.environ.get('SUMMARY_CACHE_TTL', '86400')) or None  # seconds, 0 = never expire
+SUMMARY_CACHE_PATH = os.environ.get('SUMMARY_CACHE_PATH')  # optional SQLite file to keep summaries across restarts
+
+# Long edge (px) of the downscaled copy used for wall detection; 0 keeps full-resolution detection
+DETECT_MAX_SIDE = int(os.environ.get('DETECT_MAX_SIDE', '0')) or None
+# Decode uploads as grayscale reduced by this factor (1, 2, 4 or 8); 1 keeps the full colour decode
+DECODE_REDUCE = int(os.environ.get('DECODE_REDUCE', '1'))
+
+# Views of one request (front, top, ...) are decoded and detected concurrently on this many threads;
+# OpenCV releases the GIL, so they overlap. Shared by all requests.
+VIEW_WORKERS = int(os.environ.get('VIEW_WORKERS', '4'))
+MAX_WALLS = int(os.environ.get('MAX_WALLS', '10'))  # cap for the walls=K option of /measure
+ARUCO_DICT = os.environ.get('ARUCO_DICT', wm.ARUCO_DICTIONARY)  # dictionary of printed markers (marker_size)
+# /measure_batch: images per request, and the threads measuring them (shared by all batch requests)
+MAX_BATCH_IMAGES = int(os.environ.get('MAX_BATCH_IMAGES', '100'))
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', str(os.cpu_count() or 4)))
+# Images inside a .zip batch upload are inflated one per worker; larger (or more compressed) members are
+# refused so a zip bomb cannot exhaust memory.
+MAX_ZIP_MEMBER_MB = float(os.environ.get('MAX_ZIP_MEMBER_MB', '100'))
+MAX_ZIP_RATIO = float(os.environ.get('MAX_ZIP_RATIO', '100'))
+
+# Uploads: requests above MAX_UPLOAD_MB are rejected with 413; files above UPLOAD_SPOOL_KB are spooled to a
+# temporary file and decoded from a memory map instead of being copied into Python bytes.
+MAX_UPLOAD_MB = float(os.environ.get('MAX_UPLOAD_MB', '64'))
+UPLOAD_SPOOL_KB = int(os.environ.get('UPLOAD_SPOOL_KB', '512'))
+# Report the process-wide Python/NumPy peak allocation (tracemalloc) in X-Process-Peak-MB; adds some overhead.
+# The peak is never reset: concurrent requests on one worker share it, so it is not a per-request figure.
+TRACE_MEMORY = os.environ.get('TRACE_MEMORY', '').lower() in ('1', 'true', 'yes', 'on')
+
+# Detected bbox + image size per uploaded image (keyed by content hash and detection settings), so
+# re-submitting a photo with other coverage/coats skips decode and detection. Size 0 disables it.
+BBOX_CACHE_SIZE = int(os.environ.get('BBOX_CACHE_SIZE', '256'))
+BBOX_CACHE_PATH = os.environ.get('BBOX_CACHE_PATH')  # optional SQLite file to keep the cache across restarts
+bbox_cache = LRUCache(BBOX_CACHE_SIZE, BBOX_CACHE_PATH, table='bbox') if BBOX_CACHE_SIZE > 0 else None
+
+# Every /measure and /measure_batch result is kept in this SQLite file (unset disables the store), tagged
+# with the optional project/room form fields; inserts are written in batches of MEASURE_STORE_BATCH or
+# after MEASURE_STORE_FLUSH_S seconds.
+MEASURE_STORE_PATH = os.environ.get('MEASURE_STORE_PATH')
+MEASURE_STORE_BATCH = int(os.environ.get('MEASURE_STORE_BATCH', '64'))
+MEASURE_STORE_FLUSH_S = float(os.environ.get('MEASURE_STORE_FLUSH_S', '1.0'))
+measurement_store = (MeasurementStore(MEASURE_STORE_PATH, MEASURE_STORE_BATCH, MEASURE_STORE_FLUSH_S)
+                     if MEASURE_STORE_PATH else None)
+if measurement_store is not None:
+    # the development server never calls shutdown(); write the last batch on exit
+    atexit.register(measurement_store.close)
+
+# POST /jobs queues a /measure request and returns at once; JOB_WORKERS threads per process run the queue.
+# The queue is the SQLite file JOBS_DB_PATH (default: jobs.db in JOBS_DIR, which holds the spooled uploads
+# and defaults to instance/jobs), so it survives restarts and every server process sees every job.
+# MAX_QUEUED_JOBS bounds the backlog (503 above it); finished jobs are kept JOB_TTL seconds. A running job is
+# queued again when its process has not renewed its lease for JOB_LEASE seconds (e.g. a removed container).
+JOBS_DIR = os.environ.get('JOBS_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'jobs')
+JOBS_DB_PATH = os.environ.get('JOBS_DB_PATH') or os.path.join(JOBS_DIR, 'jobs.db')
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+MAX_QUEUED_JOBS = int(os.environ.get('MAX_QUEUED_JOBS', '1000'))
+JOB_TTL = float(os.environ.get('JOB_TTL', '86400'))
+JOB_LEASE = float(os.environ.get('JOB_LEASE', '60'))
+summary_cache = (LRUCache(SUMMARY_CACHE_SIZE, SUMMARY_CACHE_PATH, table='summary', ttl=SUMMARY_CACHE_TTL)
+                 if SUMMARY_CACHE_SIZE > 0 else None)
+
+def summary_enabled() -> bool:
+    return OPENAI_BACKEND == 'mock' or bool(OPENAI_API_KEY)
+
+
+def mock_summary(result: dict) -> str:
+    """Offline stand-in for the OpenAI call: same latency shape, deterministic text."""
+    time.sleep(OPENAI_MOCK_DELAY)
+    return (
+        f"Wall of {result.get('width_m')} m x {result.get('height_m')} m ({result.get('area_m2')} m^2) "
+        f"needs about {result.get('litres')} L for {result.get('coats')} coats.\n"
+        "- Clean and prime the surface first\n- Cut in edges before rolling\n- Let each coat dry fully"
+    )
 
-def call_openai_summary(result: dict) -> Optional[str]:
+
+def call_openai_summary(result: dict, timeout: Optional[float] = None) -> Optional[str]:
     """Call OpenAI to get a concise summary/advice for the measurement.
     Returns the assistant text or None if OpenAI not configured.
     """
+    if OPENAI_BACKEND == 'mock':
+        return mock_summary(result)
     if not OPENAI_API_KEY:
         return None
     try:
@@ -35,6 +149,7 @@ def call_openai_summary(result: dict) -> Optional[str]:
                       {"role": "user", "content": prompt}],
             temperature=0.2,
             max_tokens=300,
+            request_timeout=timeout or OPENAI_TIMEOUT,
         )
         # Extract assistant reply text
         text = resp['choices'][0]['message']['content']
@@ -43,18 +158,340 @@ def call_openai_summary(result: dict) -> Optional[str]:
         # Do not fail the measurement if AI call fails — return none
         return None
 
+
+# Summaries run in the background so /measure can return as soon as the measurement is ready;
+# clients fetch the text from /summary/<job_id>. The jobs live in the job database (JOBS_DB_PATH), so a
+# poll answered by another gunicorn worker finds them too; OPENAI_CONCURRENCY threads per process call the API.
+
+
+def run_summary_job(form: Dict[str, str], files: Dict[str, str]) -> str:
+    """``summary_queue`` handler: the (cached) AI summary of the measurement result in ``form['result']``."""
+    result = json.loads(form['result'])
+    cached = summary_cache.get(summary_cache_key(result)) if summary_cache is not None else None
+    text = cached if cached is not None else cached_openai_summary(result, OPENAI_TIMEOUT)
+    if text is None:
+        raise RuntimeError('AI summary failed')
+    return text
+
+
+summary_queue = JobQueue(run_summary_job, JOBS_DB_PATH, JOBS_DIR, OPENAI_CONCURRENCY, MAX_QUEUED_JOBS,
+                         SUMMARY_JOB_TTL, table='summary_jobs', lease=JOB_LEASE)
+
+
+def summary_cache_key(result: dict) -> str:
+    """Bucketed (width, height, area, depth, litres, coverage, coats) of a measurement result."""
+    def bucket(value, size):
+        return None if value is None else int(round(value / size))
+    return ':'.join(str(v) for v in (
+        bucket(result.get('width_m'), SUMMARY_BUCKET_M),
+        bucket(result.get('height_m'), SUMMARY_BUCKET_M),
+        bucket(result.get('area_m2'), SUMMARY_BUCKET_M2),
+        bucket(result.get('depth_m'), SUMMARY_BUCKET_M),
+        bucket(result.get('litres'), SUMMARY_BUCKET_L),
+        result.get('coverage_m2_per_l'),
+        result.get('coats'),
+    ))
+
+
+def cached_openai_summary(result: dict, timeout: Optional[float] = None) -> Optional[str]:
+    """``call_openai_summary`` that stores successful replies in ``summary_cache``."""
+    with timed('openai'):
+        text = call_openai_summary(result, timeout)
+    if text is not None and summary_cache is not None:
+        summary_cache.put(summary_cache_key(result), text)
+    return text
+
+
+def submit_summary(result: dict) -> Optional[str]:
+    """Queue an AI summary for ``result``; returns the job id, or None when no backend is configured
+    (or the queue is full). The job is always queued; a cached summary of an equivalent measurement lets
+    the worker finish it without calling the backend.
+    """
+    if not summary_enabled():
+        return None
+    try:
+        return summary_queue.submit({'result': json.dumps(result)}, {})
+    except QueueFull:
+        return None
+
+
+def summary_status(job_id: str, wait: float = 0.0) -> Optional[dict]:
+    """Return {'status', 'ai'} for a summary job (None if unknown), waiting up to ``wait`` seconds for it."""
+    job = summary_queue.status(job_id, wait)
+    if job is None:
+        return None
+    if job['status'] in ('queued', 'running'):
+        # queued behind other calls for longer than a call may take
+        if time.time() - job['created'] > SUMMARY_JOB_TTL:
+            return {'status': 'timeout', 'ai': None}
+        return {'status': 'pending', 'ai': None}
+    if job['status'] == 'failed':
+        return {'status': 'error', 'ai': None}
+    return {'status': 'done', 'ai': job['result']}
+
+
+class MeasureRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # small uploads stay in memory; larger ones go to a real file so they can be memory-mapped
+        if total_content_length is not None and total_content_length <= UPLOAD_SPOOL_KB * 1024:
+            return io.BytesIO()
+        return tempfile.TemporaryFile('wb+')
+
+
+# Hot-path instrumentation, exposed on /metrics (per process) and per request in the Server-Timing header
+STAGE_SECONDS = metrics.histogram('wallmeasure_stage_seconds', 'Time spent in each /measure stage', ('stage',))
+REQUEST_BYTES = metrics.histogram('wallmeasure_request_bytes', 'Size of /measure request bodies', (),
+                                  buckets=tuple(2 ** p * 1024 for p in range(6, 17, 2)))
+IMAGE_MEGAPIXELS = metrics.histogram('wallmeasure_image_megapixels', 'Decoded image size of uploaded views', (),
+                                     buckets=(0.3, 1, 2, 4, 8, 12, 16, 24, 48, 100))
+REQUESTS = metrics.counter('wallmeasure_requests_total', 'HTTP requests by endpoint and status', ('endpoint', 'status'))
+
+
+@contextmanager
+def timed(stage: str, timings: Optional[Dict[str, float]] = None) -> Iterator[None]:
+    """Record the duration of the block in STAGE_SECONDS and, in ms, in ``timings[stage]``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed * 1000.0
+
+
+view_executor = ThreadPoolExecutor(max_workers=VIEW_WORKERS, thread_name_prefix='view')
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='batch')
+
 app = Flask(__name__, static_folder='static', template_folder='templates')
+app.request_class = MeasureRequest
+app.config['MAX_CONTENT_LENGTH'] = int(MAX_UPLOAD_MB * 1024 * 1024)
+if TRACE_MEMORY:
+    tracemalloc.start()
+
+
+@contextmanager
+def upload_buffer(fs) -> Iterator:
+    """Zero-copy view of an uploaded file: the BytesIO buffer or a read-only mmap of the spooled file."""
+    stream = fs.stream
+    if isinstance(stream, io.BytesIO):
+        view = stream.getbuffer()
+        try:
+            yield view
+        finally:
+            _release(view.release)
+        return
+    try:
+        fileno = stream.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        yield fs.read()
+        return
+    stream.flush()
+    if os.fstat(fileno).st_size == 0:
+        yield b''
+        return
+    mm = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    try:
+        yield mm
+    finally:
+        _release(mm.close)
+
+
+def _release(close) -> None:
+    """Release an upload buffer; if an array view of it is still referenced (e.g. by the traceback of the
+    exception being raised) leave it to be freed with that view rather than mask the exception.
+    """
+    try:
+        close()
+    except BufferError:
+        pass
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Process high-water resident memory in MB (None where the platform cannot tell)."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
 
 
-def read_image_file_storage(fs) -> np.ndarray:
-    data = fs.read()
+def decode_image_bytes(data) -> np.ndarray:
+    import cv2
+    import numpy as np
     arr = np.frombuffer(data, np.uint8)
     img = cv2.imdecode(arr, cv2.IMREAD_COLOR)
+    # drop the view of the upload buffer before raising, or the traceback keeps it exported
+    del arr
     if img is None:
         raise ValueError('Uploaded image could not be decoded')
     return img
 
 
+def decode_image_bytes_reduced(data, reduce: int) -> Tuple[np.ndarray, int]:
+    try:
+        return wm.decode_image_reduced(data, reduce)
+    except ValueError:
+        raise ValueError('Uploaded image could not be decoded')
+
+
+def _decode_upload(data, timings: Optional[Dict[str, float]] = None) -> Tuple[np.ndarray, int, Tuple[int, int]]:
+    """Decode an encoded image (bytes, memoryview or mmap) for detection: (img, factor, full-size (w, h)).
+    With DECODE_REDUCE > 1 the image is reduced grayscale, ``factor`` maps its px back to full size and the
+    size is the reduced size times the factor (exact to within the factor).
+    """
+    with timed('decode', timings):
+        if DECODE_REDUCE > 1:
+            img, factor = decode_image_bytes_reduced(data, DECODE_REDUCE)
+        else:
+            img, factor = decode_image_bytes(data), 1
+    size = (img.shape[1] * factor, img.shape[0] * factor)
+    IMAGE_MEGAPIXELS.observe(size[0] * size[1] / 1e6)
+    return img, factor, size
+
+
+def detect_bbox_bytes(data, timings: Optional[Dict[str, float]] = None) -> Tuple[list, Tuple[int, int]]:
+    """Decode an encoded image and detect the wall bbox: ((x, y, w, h), (image_w, image_h)) in full-size px."""
+    img, factor, size = _decode_upload(data, timings)
+    with timed('detect', timings):
+        return list(wm.scale_bbox(wm.find_wall_bbox_front(img, DETECT_MAX_SIDE), factor, size)), size
+
+
+def detect_walls_bytes(data, walls: int, timings: Optional[Dict[str, float]] = None) -> Tuple[list, Tuple[int, int]]:
+    """Like ``detect_bbox_bytes`` but returns up to ``walls`` candidates from ``wm.find_wall_candidates``
+    (bbox as a list, area_px, confidence), largest first, together with the image size.
+    """
+    img, factor, size = _decode_upload(data, timings)
+    with timed('detect', timings):
+        candidates = wm.find_wall_candidates(img, walls, DETECT_MAX_SIDE)
+    return [{'bbox': list(wm.scale_bbox(c['bbox'], factor, size)),
+             'area_px': c['area_px'] * factor * factor,
+             'confidence': c['confidence']} for c in candidates], size
+
+
+def detect_openings_bytes(data, timings: Optional[Dict[str, float]] = None) -> Tuple[list, Tuple[int, int], list]:
+    """Like ``detect_bbox_bytes`` but also returns the window/door boxes inside the wall from
+    ``wm.find_wall_bbox_and_openings``: (bbox, image size, openings), boxes as lists.
+    """
+    img, factor, size = _decode_upload(data, timings)
+    with timed('detect', timings):
+        bbox, openings = wm.find_wall_bbox_and_openings(img, DETECT_MAX_SIDE)
+    return (list(wm.scale_bbox(bbox, factor, size)), size,
+            [list(wm.scale_bbox(o, factor, size)) for o in openings])
+
+
+def detect_quad_bytes(data, timings: Optional[Dict[str, float]] = None) -> Tuple[list, Tuple[int, int], Optional[list]]:
+    """Like ``detect_bbox_bytes`` but also returns the wall quadrilateral from
+    ``wm.find_wall_bbox_and_quad``: (bbox, image size, quad or None), bbox and points as lists.
+    """
+    img, factor, size = _decode_upload(data, timings)
+    with timed('detect', timings):
+        bbox, quad = wm.find_wall_bbox_and_quad(img, DETECT_MAX_SIDE)
+    if quad is not None:
+        quad = [[px * factor, py * factor] for px, py in quad]
+    return list(wm.scale_bbox(bbox, factor, size)), size, quad
+
+
+def detect_marker_bytes(data, checkerboard: Optional[Tuple[int, int]], dictionary: str,
+                        timings: Optional[Dict[str, float]] = None) -> Optional[dict]:
+    """Decode an encoded image as full-resolution grayscale and find a printed scale marker with
+    ``wm.find_scale_marker`` (searched at DETECT_MAX_SIDE, or ``wm.MARKER_MAX_SIDE``); None when there is none.
+    """
+    with timed('decode', timings):
+        gray, _ = decode_image_bytes_reduced(data, 1)
+    with timed('detect', timings):
+        return wm.find_scale_marker(gray, checkerboard, dictionary, DETECT_MAX_SIDE)
+
+
+# detect(data, timings) -> JSON-serialisable result, and the bbox_cache key suffix naming it
+Detector = Tuple[Callable[..., Any], str]
+
+
+def front_detector(walls: int = 0, openings: bool = False, perspective: bool = False) -> Detector:
+    """The detector of a /measure front view: wall candidates with ``walls`` > 0, the wall with its
+    openings, or with its quadrilateral for ``perspective``, else the wall bbox.
+    """
+    if walls > 0:
+        return (lambda data, timings: detect_walls_bytes(data, walls, timings)), f'walls{walls}'
+    if openings:
+        return detect_openings_bytes, 'openings'
+    if perspective:
+        return detect_quad_bytes, 'quad'
+    return detect_bbox_bytes, 'bbox'
+
+
+def marker_detector(checkerboard: Optional[Tuple[int, int]], dictionary: str) -> Detector:
+    pattern = 'x'.join(map(str, checkerboard)) if checkerboard else dictionary
+    return (lambda data, timings: detect_marker_bytes(data, checkerboard, dictionary, timings)), f'marker:{pattern}'
+
+
+def cached_detect(data, detector: Detector, timings: Optional[Dict[str, float]] = None):
+    """Run a detector on an encoded image, answered from ``bbox_cache`` when the same image was seen
+    before with the same detector and settings. Results come back as JSON would (lists, ints), cached or not.
+    """
+    detect, suffix = detector
+    if bbox_cache is None:
+        return _json_value(detect(data, timings))
+    key = f'{_bbox_cache_key(data)}:{suffix}'
+    hit = bbox_cache.get(key)
+    if hit is not None:
+        return hit['result']
+    detected = _json_value(detect(data, timings))
+    # wrapped, so a None result (no marker) is cached too
+    bbox_cache.put(key, {'result': detected})
+    return detected
+
+
+def timed_detect_file_storage(fs, detector: Detector) -> Tuple[Any, Dict[str, float]]:
+    """``cached_detect`` on an upload plus its stage durations in ms ('decode', 'detect', 'total')."""
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    with upload_buffer(fs) as data:
+        detected = cached_detect(data, detector, timings)
+    timings['total'] = (time.perf_counter() - start) * 1000.0
+    return detected, timings
+
+
+def _json_value(value):
+    """``value`` with tuples as lists and NumPy scalars as Python numbers, as a cache hit returns it."""
+    return json.loads(json.dumps(value, default=lambda o: o.item()))
+
+
+def detect_views(views: Dict[str, object], front_walls: int = 0, front_openings: bool = False,
+                 front_perspective: bool = False, marker: Optional[Tuple[Optional[Tuple[int, int]], str]] = None
+                 ) -> Dict[str, Future]:
+    """Decode + detect every uploaded view concurrently on ``view_executor`` and wait for all of them
+    (the uploads are closed when the request ends). Returns completed futures keyed by view name.
+    With ``front_walls`` > 0 the front view yields that many wall candidates instead of one bbox;
+    with ``front_openings`` it also yields the windows/doors inside the wall and with
+    ``front_perspective`` the wall quadrilateral. With ``marker`` = (checkerboard, dictionary) the
+    front view is also searched for a scale marker, as a separate 'marker' entry.
+    """
+    pending = {}
+    for name, fs in views.items():
+        detector = front_detector(front_walls, front_openings, front_perspective) if name == 'front' else None
+        pending[name] = view_executor.submit(timed_detect_file_storage, fs, detector or front_detector())
+    if marker is not None:
+        pending['marker'] = view_executor.submit(timed_detect_file_storage, views['front'], marker_detector(*marker))
+    wait(pending.values())
+    return pending
+
+
+def _bbox_cache_key(data) -> str:
+    return f'{content_hash(data)}:{DETECT_MAX_SIDE}:{DECODE_REDUCE}'
+
+
+@app.after_request
+def report_memory(response):
+    REQUESTS.inc(endpoint=request.endpoint or 'unknown', status=response.status_code)
+    if request.endpoint == 'measure' and request.content_length is not None:
+        REQUEST_BYTES.observe(request.content_length)
+    rss = peak_rss_mb()
+    if rss is not None:
+        response.headers['X-Peak-RSS-MB'] = f'{rss:.1f}'
+    if TRACE_MEMORY and tracemalloc.is_tracing():
+        response.headers['X-Process-Peak-MB'] = f'{tracemalloc.get_traced_memory()[1] / 1e6:.1f}'
+    return response
+
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -65,83 +502,492 @@ def measure():
     try:
         if 'front' not in request.files:
             return jsonify({'error': 'front image is required'}), 400
+        result, status, view_timings = measure_upload(upload_views(request.files), request.form)
+        if status != 200:
+            return jsonify(result), status
+        serialize = {}
+        with timed('serialize', serialize):
+            response = jsonify(result)
+        response.headers['Server-Timing'] = server_timing(view_timings, serialize['serialize'])
+        return response
+
+    except RequestEntityTooLarge:
+        return jsonify({'error': f'upload exceeds {MAX_UPLOAD_MB:g} MB'}), 413
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue a measurement with the /measure form fields and files; returns its id without waiting."""
+    try:
+        if 'front' not in request.files:
+            return jsonify({'error': 'front image is required'}), 400
+        job_id = job_queue.submit(request.form.to_dict(), upload_views(request.files))
+    except RequestEntityTooLarge:
+        return jsonify({'error': f'upload exceeds {MAX_UPLOAD_MB:g} MB'}), 413
+    except QueueFull as e:
+        response = jsonify({'error': f'too many queued jobs ({e}), retry later'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    response = jsonify({'job_id': job_id, 'status': 'queued'})
+    response.headers['Location'] = f'/jobs/{job_id}'
+    return response, 202
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status of a queued measurement ('queued', 'running', 'done' or 'failed') with its result or error;
+    ?wait=SECONDS (capped) blocks until it has finished.
+    """
+    try:
+        wait = min(max(float(request.args.get('wait', 0)), 0.0), 30.0)
+    except ValueError:
+        return jsonify({'error': 'wait must be a number'}), 400
+    job = job_queue.status(job_id, wait)
+    if job is None:
+        return jsonify({'error': 'unknown job'}), 404
+    return jsonify(job)
+
+
+@app.route('/jobs')
+def job_stats():
+    return jsonify(job_queue.stats())
+
+
+def run_measure_job(form: Dict[str, str], files: Dict[str, str]) -> dict:
+    """``job_queue`` handler: ``measure_upload`` on the spooled files; a bad request fails the job."""
+    views = {name: FileStorage(stream=open(path, 'rb'), filename=name, name=name) for name, path in files.items()}
+    try:
+        result, status, _ = measure_upload(views, form)
+    finally:
+        for fs in views.values():
+            fs.close()
+    if status != 200:
+        raise ValueError(result['error'])
+    return result
 
-        front_fs = request.files['front']
-        front_img = read_image_file_storage(front_fs)
 
-        # detect bounding box
-        x, y, w_px, h_px = wm.find_wall_bbox_front(front_img)
-        front_h, front_w = front_img.shape[:2]
+job_queue = JobQueue(run_measure_job, JOBS_DB_PATH, JOBS_DIR, JOB_WORKERS, MAX_QUEUED_JOBS, JOB_TTL,
+                     lease=JOB_LEASE)
 
-        # parse scale/ref
-        scale = request.form.get('scale')
-        ref_real = request.form.get('ref_real')
-        ref_px = request.form.get('ref_px')
-        ref = None
-        if scale:
-            scale_val = float(scale)
+
+def upload_views(files) -> Dict[str, FileStorage]:
+    """The front upload plus the optional top/side ones that were actually sent."""
+    views = {'front': files['front']}
+    for name in ('top', 'side'):
+        if name in files and files[name].filename:
+            views[name] = files[name]
+    return views
+
+
+def measure_upload(views: Dict[str, FileStorage], form) -> Tuple[dict, int, Dict[str, Dict[str, float]]]:
+    """The /measure computation for uploaded ``views`` and the form fields: (result, or {'error'} for a
+    bad request, HTTP status, per-view stage timings). Shared by /measure and the /jobs workers.
+    """
+    view_timings: Dict[str, Dict[str, float]] = {}
+    try:
+        # walls=K: report up to K wall regions of the front image with per-wall and total paint
+        walls = int(form.get('walls') or 0)
+        # marker_size: take the scale from a printed ArUco marker (or checkerboard square) of this size
+        marker_m = float(form.get('marker_size') or 0) or None
+        checkerboard = wm.parse_checkerboard(form['checkerboard']) if form.get('checkerboard') else None
+    except ValueError as e:
+        return {'error': str(e)}, 400, view_timings
+    walls = min(max(walls, 0), MAX_WALLS)
+    # openings: subtract detected windows/doors from the painted area
+    openings = form.get('openings', '').lower() in ('1', 'true', 'yes', 'on')
+    # perspective: measure the wall quadrilateral rectified instead of the axis-aligned bbox
+    perspective = form.get('perspective', '').lower() in ('1', 'true', 'yes', 'on')
+    if (walls > 0) + openings + perspective > 1:
+        return {'error': 'walls, openings and perspective cannot be combined'}, 400, view_timings
+    if marker_m is not None and not (math.isfinite(marker_m) and marker_m > 0):
+        return {'error': 'marker_size must be a positive number'}, 400, view_timings
+
+    # decode and detect bounding boxes of all views concurrently
+    detected = detect_views(views, walls, openings, perspective,
+                            (checkerboard, ARUCO_DICT) if marker_m is not None else None)
+    try:
+        front, view_timings['front'] = detected['front'].result()
+    except ValueError as e:
+        # an upload that is not an image
+        return {'error': str(e)}, 400, view_timings
+    if walls > 0:
+        candidates, (front_w, front_h) = front
+        x, y, w_px, h_px = candidates[0]['bbox']
+    elif openings:
+        (x, y, w_px, h_px), (front_w, front_h), found = front
+    elif perspective:
+        (x, y, w_px, h_px), (front_w, front_h), quad = front
+    else:
+        (x, y, w_px, h_px), (front_w, front_h) = front
+    rect_w, rect_h = w_px, h_px
+    if perspective and quad is not None:
+        rect_w, rect_h, _ = wm.rectify_quad(quad, (front_w, front_h))
+
+    scale_val, ref, coverage, coats, round_up = parse_measure_params(form)
+    warnings = []
+    marker = None
+    if marker_m is not None:
+        marker, view_timings['marker'] = detected['marker'].result()
+        if marker is not None:
+            scale_val, ref = wm.marker_scale(marker, marker_m), None
+        elif scale_val is None and ref is None:
+            return ({'error': 'no scale marker found in the front image; enter a scale or reference'}, 400,
+                    view_timings)
         else:
-            scale_val = None
-            if ref_real and ref_px:
-                ref = (float(ref_real), float(ref_px))
+            warnings.append('no scale marker found in the front image, using the manual scale')
 
-        # compute meters
+    # compute meters
+    try:
+        width_m = wm.px_to_meters(rect_w, scale_val, ref)
+        height_m = wm.px_to_meters(rect_h, scale_val, ref)
+    except ValueError as e:
+        return {'error': str(e)}, 400, view_timings
+
+    # depth from the top and/or side view (the wall's depth is the bbox width in both), cross-checked
+    depths = {}
+    for name in ('top', 'side'):
+        if name not in detected:
+            continue
         try:
-            width_m = wm.px_to_meters(w_px, scale_val, ref)
-            height_m = wm.px_to_meters(h_px, scale_val, ref)
-        except ValueError as e:
-            return jsonify({'error': str(e)}), 400
-
-        depth_m = None
-        if 'top' in request.files and request.files['top'].filename:
-            top_fs = request.files['top']
-            try:
-                top_img = read_image_file_storage(top_fs)
-                _, _, top_w_px, _ = wm.find_wall_bbox_front(top_img)
-                depth_m = wm.px_to_meters(top_w_px, scale_val, ref)
-            except Exception as ex:
-                # non-fatal
-                depth_m = None
+            ((_, _, view_w_px, _), _), view_timings[name] = detected[name].result()
+            depths[name] = wm.px_to_meters(view_w_px, scale_val, ref)
+        except Exception as ex:
+            # non-fatal
+            warnings.append(f"couldn't measure depth from {name} image: {ex}")
+    depth_m, warning = wm.fuse_depth(depths.get('top'), depths.get('side'))
+    if warning:
+        warnings.append(warning)
 
-        area_m2 = width_m * height_m
+    result = base_result((x, y, w_px, h_px), (front_w, front_h), width_m, height_m, depth_m,
+                         coverage, coats, round_up, view_timings)
+    result['depth_views'] = {name: round(d, 3) for name, d in depths.items()}
+    result['warnings'] = warnings
+    if openings:
+        openings_m2 = wm.openings_area_m2(found, scale_val, ref)
+        net_area_m2 = max(0.0, width_m * height_m - openings_m2)
+        result['litres'] = wm.estimate_paint_litres(net_area_m2, coverage, coats, round_up)
+    if perspective:
+        # quad is None when the outline was not four-sided and the bbox was measured
+        result['quad'] = [[round(px, 2), round(py, 2)] for px, py in quad] if quad is not None else None
+        result['rectified_px'] = ({'w_px': round(rect_w, 1), 'h_px': round(rect_h, 1)}
+                                  if quad is not None else None)
+    if openings:
+        result['openings'] = [{'x_px': int(ox), 'y_px': int(oy), 'w_px': int(ow), 'h_px': int(oh)}
+                              for ox, oy, ow, oh in found]
+        result['openings_m2'] = round(openings_m2, 3)
+        result['net_area_m2'] = round(net_area_m2, 3)
+    if walls > 0:
+        result.update(wall_results(candidates, scale_val, ref, coverage, coats, round_up))
+    if marker_m is not None:
+        result['marker'] = marker
+        result['scale_m_per_px'] = scale_val if marker is not None else None
 
-        coverage = float(request.form.get('coverage', 10.0))
-        coats = float(request.form.get('coats', 2.0))
-        no_round = request.form.get('no_round', 'false').lower() in ('1', 'true', 'yes', 'on')
+    if measurement_store is not None:
+        params = {'scale': scale_val, 'ref': ref, 'coverage': coverage, 'coats': coats, 'round_up': round_up,
+                  'walls': walls, 'openings': openings, 'perspective': perspective, 'marker_size': marker_m,
+                  'views': sorted(views)}
+        result['measurement_id'] = record_measurement(result, upload_hash(views['front']),
+                                                      form.get('project', ''),
+                                                      form.get('room', ''), params)
+
+    # If client requested AI summary, queue it (optional); the text is fetched from /summary/<ai_job>
+    use_ai = form.get('use_ai', '').lower() in ('1', 'true', 'yes', 'on')
+    result['ai'] = None
+    result['ai_job'] = submit_summary(result) if use_ai else None
+    return result, 200, view_timings
+
+
+def parse_measure_params(form) -> Tuple[Optional[float], Optional[Tuple[float, float]], float, float, bool]:
+    """(scale, ref, coverage, coats, round_up) from the scale/ref_real/ref_px/coverage/coats/no_round
+    form fields shared by /measure and /measure_batch.
+    """
+    scale = form.get('scale')
+    ref_real = form.get('ref_real')
+    ref_px = form.get('ref_px')
+    ref = None
+    if scale:
+        scale_val = float(scale)
+    else:
+        scale_val = None
+        if ref_real and ref_px:
+            ref = (float(ref_real), float(ref_px))
+    coverage = float(form.get('coverage', 10.0))
+    coats = float(form.get('coats', 2.0))
+    no_round = form.get('no_round', 'false').lower() in ('1', 'true', 'yes', 'on')
+    return scale_val, ref, coverage, coats, not no_round
+
+
+def base_result(bbox: Tuple[int, int, int, int], size: Tuple[int, int], width_m: float, height_m: float,
+                depth_m: Optional[float], coverage: float, coats: float, round_up: bool,
+                view_timings: Dict[str, Dict[str, float]]) -> dict:
+    """The measurement fields every /measure and /measure_batch result has."""
+    x, y, w_px, h_px = bbox
+    area_m2 = width_m * height_m
+    return {
+        'width_m': round(width_m, 3),
+        'height_m': round(height_m, 3),
+        'depth_m': round(depth_m, 3) if depth_m is not None else None,
+        'area_m2': round(area_m2, 3),
+        'coverage_m2_per_l': coverage,
+        'coats': coats,
+        'litres': wm.estimate_paint_litres(area_m2, coverage, coats, round_up),
+        'bbox': {
+            'x_px': int(x),
+            'y_px': int(y),
+            'w_px': int(w_px),
+            'h_px': int(h_px),
+            'image_w_px': int(size[0]),
+            'image_h_px': int(size[1]),
+        },
+        'timing_ms': {name: round(t['total'], 1) for name, t in view_timings.items()},
+    }
+
+
+@app.route('/measure_batch', methods=['POST'])
+def measure_batch():
+    """Measure many front images in one request: ``images`` file fields (repeatable), where a .zip
+    upload contributes every image inside it. Results stream back as NDJSON, one line per image in
+    completion order, each with the /measure fields plus ``index`` and ``name`` (or ``error``).
+    """
+    try:
+        # the uploads are read while the response streams, after the request itself has been closed
+        uploads = [detach_upload(fs) for fs in request.files.getlist('images') if fs.filename]
+    except RequestEntityTooLarge:
+        return jsonify({'error': f'upload exceeds {MAX_UPLOAD_MB:g} MB'}), 413
+    try:
+        params = parse_measure_params(request.form)
+        wm.px_to_meters(1, params[0], params[1])
+        items = batch_items(uploads)
+        if not items:
+            raise ValueError('no images uploaded (use the images field)')
+        if len(items) > MAX_BATCH_IMAGES:
+            raise ValueError(f'at most {MAX_BATCH_IMAGES} images per batch, got {len(items)}')
+    except (ValueError, zipfile.BadZipFile) as e:
+        for fs in uploads:
+            fs.close()
+        return jsonify({'error': str(e)}), 400
 
-        litres = wm.estimate_paint_litres(area_m2, coverage, coats, not no_round)
+    store_as = ((request.form.get('project', ''), request.form.get('room', ''))
+                if measurement_store is not None else None)
+    futures = [batch_executor.submit(measure_batch_item, i, name, source, params, store_as)
+               for i, (name, source) in enumerate(items)]
 
-        result = {
+    def generate():
+        for future in as_completed(futures):
+            yield json.dumps(future.result()) + '\n'
+
+    def release():
+        # also when the client went away before or during streaming: drop what has not started, then
+        # release the uploads
+        for future in futures:
+            future.cancel()
+        wait(futures)
+        for fs in uploads:
+            fs.close()
+
+    response = Response(generate(), mimetype='application/x-ndjson')
+    response.call_on_close(release)
+    return response
+
+
+def detach_upload(fs) -> FileStorage:
+    """Move an upload's stream into a new FileStorage that the request no longer closes on teardown."""
+    detached = FileStorage(fs.stream, fs.filename, fs.name, fs.content_type, headers=fs.headers)
+    fs.stream = io.BytesIO()
+    return detached
+
+
+def batch_items(files) -> list:
+    """(name, source) per image of a batch upload: the FileStorage itself, or (ZipFile, member) for
+    images inside a .zip upload (read by the worker, so only images in flight are held in memory).
+    """
+    items = []
+    for fs in files:
+        if fs.filename.lower().endswith('.zip'):
+            archive = zipfile.ZipFile(fs.stream)
+            for info in archive.infolist():
+                name = info.filename
+                if (info.is_dir() or name.startswith('__MACOSX/')
+                        or not name.lower().endswith(wm.IMAGE_EXTENSIONS)):
+                    continue
+                if info.file_size > MAX_ZIP_MEMBER_MB * 1024 * 1024:
+                    raise ValueError(f'{fs.filename}/{name} inflates to {info.file_size / 1e6:.0f} MB '
+                                     f'(at most {MAX_ZIP_MEMBER_MB:g} MB per image)')
+                if info.file_size > MAX_ZIP_RATIO * max(info.compress_size, 1):
+                    raise ValueError(f'{fs.filename}/{name} is compressed more than {MAX_ZIP_RATIO:g}:1')
+                items.append((f'{fs.filename}/{name}', (archive, name)))
+        else:
+            items.append((fs.filename, fs))
+    return items
+
+
+def measure_batch_item(index: int, name: str, source, params: tuple,
+                       store_as: Optional[Tuple[str, str]] = None) -> dict:
+    """One /measure_batch result line; failures are reported in ``error`` rather than raised.
+    With ``store_as`` = (project, room) the result is also recorded in ``measurement_store``.
+    """
+    scale, ref, coverage, coats, round_up = params
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    try:
+        if isinstance(source, tuple):
+            archive, member = source
+            data = archive.read(member)
+            bbox, size = cached_detect(data, front_detector(), timings)
+            image_hash = content_hash(data) if store_as is not None else None
+        else:
+            with upload_buffer(source) as data:
+                bbox, size = cached_detect(data, front_detector(), timings)
+            image_hash = upload_hash(source) if store_as is not None else None
+        timings['total'] = (time.perf_counter() - start) * 1000.0
+        width_m = wm.px_to_meters(bbox[2], scale, ref)
+        height_m = wm.px_to_meters(bbox[3], scale, ref)
+        result = base_result(bbox, size, width_m, height_m, None, coverage, coats, round_up, {'front': timings})
+        if store_as is not None:
+            result['measurement_id'] = record_measurement(
+                result, image_hash, *store_as,
+                {'scale': scale, 'ref': ref, 'coverage': coverage, 'coats': coats, 'round_up': round_up,
+                 'name': name})
+    except Exception as e:
+        return {'index': index, 'name': name, 'error': str(e)}
+    return {'index': index, 'name': name, **result}
+
+
+def upload_hash(fs) -> str:
+    """``content_hash`` of an upload, read through ``upload_buffer`` without copying it."""
+    with upload_buffer(fs) as data:
+        return content_hash(data)
+
+
+def record_measurement(result: dict, image_hash: Optional[str], project: str, room: str, params: dict) -> str:
+    """Queue ``result`` in ``measurement_store`` and return its id (the insert is batched)."""
+    return measurement_store.add(result, project.strip(), room.strip(), image_hash, params)
+
+
+def wall_results(candidates: list, scale: Optional[float], ref: Optional[Tuple[float, float]],
+                 coverage: float, coats: float, round_up: bool) -> dict:
+    """Per-wall sizes and paint for ``walls`` candidates, plus totals (paint estimated on the summed area)."""
+    walls = []
+    total_area = 0.0
+    for c in candidates:
+        x, y, w_px, h_px = c['bbox']
+        width_m = wm.px_to_meters(w_px, scale, ref)
+        height_m = wm.px_to_meters(h_px, scale, ref)
+        area_m2 = width_m * height_m
+        total_area += area_m2
+        walls.append({
             'width_m': round(width_m, 3),
             'height_m': round(height_m, 3),
-            'depth_m': round(depth_m, 3) if depth_m is not None else None,
             'area_m2': round(area_m2, 3),
-            'coverage_m2_per_l': coverage,
-            'coats': coats,
-            'litres': litres,
-            'bbox': {
-                'x_px': int(x),
-                'y_px': int(y),
-                'w_px': int(w_px),
-                'h_px': int(h_px),
-                'image_w_px': int(front_w),
-                'image_h_px': int(front_h),
-            }
-        }
-
-        # If client requested AI summary, try to call OpenAI (optional)
-        use_ai = request.form.get('use_ai', '').lower() in ('1', 'true', 'yes', 'on')
-        if use_ai:
-            ai_text = call_openai_summary(result)
-            result['ai'] = ai_text
-        else:
-            result['ai'] = None
-        return jsonify(result)
+            'litres': wm.estimate_paint_litres(area_m2, coverage, coats, round_up),
+            'confidence': c['confidence'],
+            'bbox': {'x_px': int(x), 'y_px': int(y), 'w_px': int(w_px), 'h_px': int(h_px)},
+        })
+    return {
+        'walls': walls,
+        'total_area_m2': round(total_area, 3),
+        'total_litres': wm.estimate_paint_litres(total_area, coverage, coats, round_up),
+    }
 
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+
+def server_timing(view_timings: Dict[str, Dict[str, float]], serialize_ms: float) -> str:
+    """Server-Timing header value, e.g. 'front-decode;dur=12.3, front-detect;dur=40.1, serialize;dur=0.2'."""
+    entries = [f'{view}-{stage};dur={ms:.1f}'
+               for view, stages in view_timings.items()
+               for stage, ms in stages.items() if stage != 'total']
+    entries.append(f'serialize;dur={serialize_ms:.1f}')
+    return ', '.join(entries)
+
+
+@app.route('/projects')
+def projects():
+    """Measurement count, painted area (net of openings, all walls with walls=K) and litres per project."""
+    if measurement_store is None:
+        return jsonify({'error': 'measurement store is disabled (set MEASURE_STORE_PATH)'}), 404
+    return jsonify({'projects': measurement_store.projects()})
+
+
+@app.route('/projects/<project>')
+def project_totals(project):
+    """Totals of one project and of each of its rooms."""
+    if measurement_store is None:
+        return jsonify({'error': 'measurement store is disabled (set MEASURE_STORE_PATH)'}), 404
+    totals = measurement_store.project_totals(project)
+    if totals is None:
+        return jsonify({'error': 'unknown project'}), 404
+    return jsonify(totals)
+
+
+@app.route('/measurements')
+def measurements():
+    """Stored results, newest first: ?project=&room=&since=<unix time>&limit= (at most 1000)."""
+    if measurement_store is None:
+        return jsonify({'error': 'measurement store is disabled (set MEASURE_STORE_PATH)'}), 404
+    try:
+        since = float(request.args['since']) if request.args.get('since') else None
+        limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+    except ValueError:
+        return jsonify({'error': 'since and limit must be numbers'}), 400
+    records = measurement_store.recent(request.args.get('project'), request.args.get('room'), since, limit)
+    return jsonify({'measurements': records})
+
+
+@app.route('/measurements/<measurement_id>')
+def measurement(measurement_id):
+    if measurement_store is None:
+        return jsonify({'error': 'measurement store is disabled (set MEASURE_STORE_PATH)'}), 404
+    record = measurement_store.get(measurement_id)
+    if record is None:
+        return jsonify({'error': 'unknown measurement'}), 404
+    return jsonify(record)
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/summary/<job_id>')
+def summary(job_id):
+    # optional long-poll: ?wait=SECONDS (capped) blocks until the summary is ready
+    try:
+        wait = min(max(float(request.args.get('wait', 0)), 0.0), 30.0)
+    except ValueError:
+        return jsonify({'error': 'wait must be a number'}), 400
+    status = summary_status(job_id, wait)
+    if status is None:
+        return jsonify({'error': 'unknown summary job'}), 404
+    return jsonify(status)
+
+
+@app.route('/cache/stats')
+def cache_stats():
+    return jsonify({
+        'bbox': bbox_cache.stats() if bbox_cache is not None else None,
+        'summary': summary_cache.stats() if summary_cache is not None else None,
+    })
+
+
+def shutdown(wait_for_jobs: bool = True) -> None:
+    """Stop the background pools; in-flight work finishes and queued measurement records are written.
+    Queued jobs and summaries stay queued for the next start.
+    """
+    job_queue.shutdown(wait=wait_for_jobs)
+    summary_queue.shutdown(wait=wait_for_jobs)
+    view_executor.shutdown(wait=wait_for_jobs)
+    batch_executor.shutdown(wait=wait_for_jobs, cancel_futures=True)
+    if measurement_store is not None:
+        measurement_store.close()
 
 
 if __name__ == '__main__':
+    # Development server only; production runs under gunicorn: gunicorn -c gunicorn.conf.py wsgi:app
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=True)
+    debug = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes', 'on')
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        # resume jobs queued before a restart (in the reloader's serving child only)
+        job_queue.start()
+        summary_queue.start()
+    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
@@ -31,6 +31,35 @@ document.querySelector('input[name="front"]').addEventListener('change', (ev) =>
   frontPreview.src = url;
 });
 
+function formatServerTiming(header) {
+  // "front-decode;dur=12.3, front-detect;dur=40.1" -> "front-decode 12 ms, front-detect 40 ms"
+  if (!header) return '';
+  return header.split(',').map((entry) => {
+    const [name, ...params] = entry.trim().split(';');
+    const dur = params.find((p) => p.trim().startsWith('dur='));
+    return dur ? `${name} ${Math.round(parseFloat(dur.trim().slice(4)))} ms` : name;
+  }).join(', ');
+}
+
+async function pollSummary(jobId, aiCard, aiResult) {
+  // long-poll /summary/<id> until the background AI call finishes
+  for (let attempt = 0; attempt < 10; attempt++) {
+    try {
+      const res = await fetch(`/summary/${jobId}?wait=10`);
+      const json = await res.json();
+      if (!res.ok || json.status === 'error' || json.status === 'timeout') break;
+      if (json.status === 'done') {
+        aiResult.textContent = json.ai;
+        return;
+      }
+    } catch (err) {
+      break;
+    }
+  }
+  aiCard.style.display = 'none';
+  aiResult.textContent = '';
+}
+
 formEl.addEventListener('submit', async (e) => {
   e.preventDefault();
   const form = e.target;
@@ -48,19 +77,37 @@ formEl.addEventListener('submit', async (e) => {
 
     // show results
     let out = '';
+    if (json.marker) {
+      const name = json.marker.kind === 'checkerboard' ? 'checkerboard' : `ArUco marker #${json.marker.id}`;
+      out += `Scale from ${name}: ${json.scale_m_per_px.toPrecision(4)} m/px\n`;
+    }
     out += `Width (m): ${json.width_m}\n`;
     out += `Height (m): ${json.height_m}\n`;
-    if (json.depth_m !== null) out += `Depth (m): ${json.depth_m}\n`;
+    if (json.depth_m !== null) {
+      const views = Object.entries(json.depth_views || {}).map(([view, d]) => `${view} ${d}`).join(', ');
+      out += `Depth (m): ${json.depth_m}` + (views ? ` (${views})` : '') + '\n';
+    }
+    if (json.rectified_px) out += `Perspective corrected: ${json.rectified_px.w_px} x ${json.rectified_px.h_px} px\n`;
+    else if ('quad' in json) out += 'Perspective: no four-sided outline found, bbox measured\n';
     out += `Area (m^2): ${json.area_m2}\n`;
+    if (json.openings) out += `Windows/doors: ${json.openings.length} (${json.openings_m2} m^2), paintable area: ${json.net_area_m2} m^2\n`;
     out += `Estimated paint: ${json.litres} L\n`;
+    for (const warning of json.warnings || []) out += `Warning: ${warning}\n`;
+    if (json.measurement_id) out += `Saved as measurement ${json.measurement_id}\n`;
+    const timing = formatServerTiming(res.headers.get('Server-Timing'));
+    if (timing) out += `Server time: ${timing}\n`;
     resultDiv.textContent = out;
 
-    // show AI result if present
+    // show AI result if present, or fetch it in the background when it was queued
     const aiCard = document.getElementById('aiCard');
     const aiResult = document.getElementById('aiResult');
     if (json.ai && json.ai.trim()) {
       aiCard.style.display = 'block';
       aiResult.textContent = json.ai;
+    } else if (json.ai_job) {
+      aiCard.style.display = 'block';
+      aiResult.textContent = 'Generating summary...';
+      pollSummary(json.ai_job, aiCard, aiResult);
     } else {
       aiCard.style.display = 'none';
       aiResult.textContent = '';
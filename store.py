@@ -0,0 +1,200 @@
+"""
+Embedded SQLite store of measurement results, so quotes can be rebuilt and totalled without re-measuring.
+
+Each record keeps the full result JSON with the bbox, the request parameters, the image hash and the
+painted area/litres pulled out into columns. The covering index on (project, room, area_m2, litres)
+answers per-project and per-room totals without touching the table. The database runs in WAL mode, so
+readers never wait for the writer. Inserts are buffered and written in batches, at ``batch_size`` records
+or after ``flush_interval`` seconds. Reads flush this process's buffer first, so they see every record
+added in the same process; records still buffered in another worker process show up once it flushes.
+"""
+from __future__ import annotations
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS measurements ("
+    "id TEXT PRIMARY KEY, created REAL NOT NULL, project TEXT NOT NULL DEFAULT '', room TEXT NOT NULL DEFAULT '', "
+    "image_hash TEXT, area_m2 REAL, litres REAL, bbox TEXT, params TEXT, result TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS measurements_project_room ON measurements (project, room, area_m2, litres)",
+    "CREATE INDEX IF NOT EXISTS measurements_project_created ON measurements (project, created)",
+    "CREATE INDEX IF NOT EXISTS measurements_created ON measurements (created)",
+    "CREATE INDEX IF NOT EXISTS measurements_image_hash ON measurements (image_hash)",
+)
+_COLUMNS = ("id", "created", "project", "room", "image_hash", "area_m2", "litres", "bbox", "params", "result")
+
+
+def painted_totals(result: dict) -> tuple:
+    """(area_m2, litres) a result asks to paint: all walls with ``walls``, the net area with openings."""
+    if result.get("total_area_m2") is not None:
+        return result["total_area_m2"], result.get("total_litres")
+    if result.get("net_area_m2") is not None:
+        return result["net_area_m2"], result.get("litres")
+    return result.get("area_m2"), result.get("litres")
+
+
+class MeasurementStore:
+    """Buffered writer and aggregate reader over one SQLite file.
+
+    Like ``cache.LRUCache`` the database is opened on first use, so a store created before a pre-fork
+    server forks gets one connection (and one flush thread) per worker.
+    """
+
+    def __init__(self, path: str, batch_size: int = 64, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._pending: List[tuple] = []
+        self._lock = threading.Lock()        # guards the connection and batch writes
+        self._cond = threading.Condition()   # guards _pending, wakes the flush thread
+        self._db: Optional[sqlite3.Connection] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+
+    def add(self, result: dict, project: str = "", room: str = "", image_hash: Optional[str] = None,
+            params: Optional[dict] = None) -> str:
+        """Queue a result for insertion and return its id; it is written with the next batch."""
+        record_id = uuid.uuid4().hex
+        area_m2, litres = painted_totals(result)
+        row = (record_id, time.time(), project or "", room or "", image_hash, area_m2, litres,
+               json.dumps(result.get("bbox")), json.dumps(params or {}), json.dumps(result))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("measurement store is closed")
+            self._pending.append(row)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="measurement-store", daemon=True)
+                self._flusher.start()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        return record_id
+
+    def flush(self) -> int:
+        """Write every queued record in one transaction; returns how many were written."""
+        # taken before the queue so a reader that flushes waits for a batch another thread is writing
+        with self._lock:
+            with self._cond:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            try:
+                db = self._connect()
+                with db:
+                    db.executemany(f"INSERT INTO measurements ({', '.join(_COLUMNS)}) "
+                                   f"VALUES ({', '.join('?' * len(_COLUMNS))})", rows)
+            except sqlite3.Error:
+                # keep the batch for the next flush
+                with self._cond:
+                    self._pending[:0] = rows
+                raise
+        return len(rows)
+
+    def close(self) -> None:
+        """Flush, stop the flush thread and close the connection."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """One stored record, or None."""
+        rows = self._query(f"SELECT {', '.join(_COLUMNS)} FROM measurements WHERE id = ?", (record_id,))
+        return _record(rows[0]) if rows else None
+
+    def recent(self, project: Optional[str] = None, room: Optional[str] = None, since: Optional[float] = None,
+               limit: int = 100) -> List[Dict[str, Any]]:
+        """Newest records first, optionally of one project (and room) and newer than ``since``."""
+        where, args = [], []
+        if project is not None:
+            where.append("project = ?")
+            args.append(project)
+            if room is not None:
+                where.append("room = ?")
+                args.append(room)
+        if since is not None:
+            where.append("created >= ?")
+            args.append(since)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM measurements"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = self._query(sql + " ORDER BY created DESC LIMIT ?", (*args, limit))
+        return [_record(row) for row in rows]
+
+    def projects(self) -> List[Dict[str, Any]]:
+        """Measurement count, painted area and litres per project."""
+        rows = self._query("SELECT project, COUNT(*), TOTAL(area_m2), TOTAL(litres) FROM measurements "
+                           "GROUP BY project ORDER BY project")
+        return [_totals(row, "project") for row in rows]
+
+    def project_totals(self, project: str) -> Optional[Dict[str, Any]]:
+        """Totals of one project and of each of its rooms; None for an unknown project."""
+        rows = self._query("SELECT room, COUNT(*), TOTAL(area_m2), TOTAL(litres) FROM measurements "
+                           "WHERE project = ? GROUP BY room ORDER BY room", (project,))
+        if not rows:
+            return None
+        rooms = [_totals(row, "room") for row in rows]
+        return {
+            "project": project,
+            "measurements": sum(r["measurements"] for r in rooms),
+            "area_m2": round(sum(r["area_m2"] for r in rooms), 3),
+            "litres": round(sum(r["litres"] for r in rooms), 2),
+            "rooms": rooms,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self._query("SELECT COUNT(*) FROM measurements")
+        with self._cond:
+            pending = len(self._pending)
+        return {"path": self.path, "measurements": rows[0][0], "pending": pending, "batch_size": self.batch_size}
+
+    def _query(self, sql: str, args: tuple = ()) -> list:
+        self.flush()
+        with self._lock:
+            return self._connect().execute(sql, args).fetchall()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            if closed:
+                return
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # a locked or full database: the next batch retries with a fresh transaction
+                time.sleep(self.flush_interval)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                db.execute(statement)
+            db.commit()
+            self._db = db
+        return self._db
+
+
+def _totals(row: tuple, key: str) -> Dict[str, Any]:
+    name, count, area_m2, litres = row
+    return {key: name, "measurements": count, "area_m2": round(area_m2, 3), "litres": round(litres, 2)}
+
+
+def _record(row: tuple) -> Dict[str, Any]:
+    record = dict(zip(_COLUMNS, row))
+    for key in ("bbox", "params", "result"):
+        record[key] = json.loads(record[key]) if record[key] is not None else None
+    return record
@@ -0,0 +1,31 @@
+"""The CLI's --help and --version must not import cv2 or numpy (see benchmarks/check_startup.py)."""
+from __future__ import annotations
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("cv2", "numpy")
+
+
+def imported_modules(*args: str) -> set:
+    """Top-level packages imported by ``python -X importtime wall_measure.py ARGS``."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", os.path.join(ROOT, "wall_measure.py"), *args],
+                          capture_output=True, text=True, cwd=ROOT, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    modules = set()
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            modules.add(name.split(".")[0])
+    return modules
+
+
+@pytest.mark.parametrize("flag", ["--help", "--version"])
+def test_cli_flags_skip_heavy_imports(flag):
+    modules = imported_modules(flag)
+    assert "argparse" in modules  # the log was parsed
+    assert not modules & set(HEAVY)
@@ -0,0 +1,29 @@
+"""Uploads that cannot be decoded are rejected with 400, however they were buffered."""
+from __future__ import annotations
+import io
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import server  # noqa: E402
+
+
+def post_front(data: bytes):
+    client = server.app.test_client()
+    return client.post('/measure', data={'front': (io.BytesIO(data), 'wall.jpg'), 'scale': '0.005'},
+                       content_type='multipart/form-data')
+
+
+def test_small_undecodable_upload():
+    resp = post_front(b'not an image')
+    assert resp.status_code == 400
+    assert 'decoded' in resp.get_json()['error']
+
+
+def test_spooled_undecodable_upload():
+    # above UPLOAD_SPOOL_KB the upload is spooled to disk and decoded from an mmap
+    resp = post_front(b'\0' * (server.UPLOAD_SPOOL_KB * 1024 * 2))
+    assert resp.status_code == 400
+    assert 'decoded' in resp.get_json()['error']
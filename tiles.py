@@ -0,0 +1,223 @@
+"""
+Wall detection on images too large to decode whole (drone orthomosaics, gigapixel TIFFs).
+
+``TiledImage`` reads windows of a memory-mapped ``.npy`` array or uncompressed TIFF, or decodes only the
+tiles/strips of a tiled or striped TIFF that a window touches (TIFFs need tifffile). ``find_wall_bbox_tiled``
+then does what ``wall_measure.find_wall_bbox_front`` does with ``max_side``: tiles are read and downscaled on
+a thread pool into the detection copy, the wall contour is found there, and its four edges are refined at
+full resolution from bands read in overlapping chunks. Peak memory is the detection copy plus one tile per
+worker, whatever the image size.
+
+Usage:
+    python wall_measure.py --front orthomosaic.tif --tiled --scale 0.01
+"""
+from __future__ import annotations
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import wall_measure as wm
+
+TILED_EXTENSIONS = (".npy", ".tif", ".tiff")
+# side (px) of the square windows read per task; TIFF windows are whole multiples of the file's own tiles
+TILE_SIZE = 2048
+# extra px read either side of each refinement chunk so Canny sees the same neighbourhood as on the whole band
+TILE_OVERLAP = 32
+# long edge (px) of the detection copy when no --max-side is given
+TILED_MAX_SIDE = 2048
+
+
+class TiledImage:
+    """Window reads from a large image without loading it; use as a context manager.
+    ``size`` is (w, h); ``read_gray(x0, y0, x1, y1)`` returns that window as 8-bit grayscale.
+    """
+
+    def __init__(self, path: str):
+        import numpy as np
+        self.path = path
+        self._array = None  # memory-mapped pixels when the file allows it
+        self._page = None   # else the TIFF page whose tiles/strips are decoded on demand
+        self._tiff = None
+        self._fd = None
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".npy":
+            self._array = np.load(path, mmap_mode="r")
+            self._bgr = True  # arrays follow the OpenCV channel order
+        elif ext in (".tif", ".tiff"):
+            self._open_tiff(path)
+            self._bgr = False
+        else:
+            raise ValueError(f"tiled mode reads {', '.join(TILED_EXTENSIONS)} files, not {path}")
+        shape = self._array.shape if self._array is not None else self._page.shape
+        if len(shape) not in (2, 3):
+            raise ValueError(f"{path}: expected a 2-D grayscale or 3-D colour image, got shape {shape}")
+        dtype = self._array.dtype if self._array is not None else self._page.dtype
+        if dtype not in (np.uint8, np.uint16):
+            raise ValueError(f"{path}: only 8- and 16-bit images are supported, got {dtype}")
+        self.size = (int(shape[1]), int(shape[0]))
+        self._shape = shape
+
+    def _open_tiff(self, path: str) -> None:
+        try:
+            import tifffile
+        except ImportError:
+            raise RuntimeError("tiled TIFF reading needs tifffile: pip install tifffile") from None
+        self._tiff = tifffile.TiffFile(path)
+        page = self._tiff.pages[0]
+        if page.is_memmappable:
+            self._array = tifffile.memmap(path, mode="r")
+            return
+        if page.planarconfig != 1 and page.samplesperpixel > 1:
+            raise ValueError(f"{path}: planar (separate) TIFF samples are not supported in tiled mode")
+        self._page = page
+        self._fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._tiff is not None:
+            self._tiff.close()
+            self._tiff = None
+        self._array = None
+
+    def __enter__(self) -> "TiledImage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _segment_size(self) -> Tuple[int, int]:
+        """(w, h) of one stored tile or strip, or (0, 0) for a memory-mapped source."""
+        if self._page is None:
+            return 0, 0
+        if self._page.is_tiled:
+            return int(self._page.tilewidth), int(self._page.tilelength)
+        return self.size[0], min(int(self._page.rowsperstrip), self.size[1])
+
+    def windows(self, tile: int = TILE_SIZE) -> Iterator[Tuple[int, int, int, int]]:
+        """(x0, y0, x1, y1) windows covering the image, each about ``tile`` x ``tile`` px and made of
+        whole stored tiles/strips, so each of those is decoded once.
+        """
+        w, h = self.size
+        seg_w, seg_h = self._segment_size()
+        if seg_w == w and seg_h:
+            # strips span the full width: windows are bands of about tile * tile px
+            tile_w, tile_h = w, max(1, tile * tile // w)
+        else:
+            tile_w = tile_h = tile
+        if seg_w and seg_h:
+            tile_w = max(seg_w, tile_w // seg_w * seg_w)
+            tile_h = max(seg_h, tile_h // seg_h * seg_h)
+        for y0 in range(0, h, tile_h):
+            for x0 in range(0, w, tile_w):
+                yield x0, y0, min(w, x0 + tile_w), min(h, y0 + tile_h)
+
+    def read_gray(self, x0: int, y0: int, x1: int, y1: int):
+        """The window [y0:y1, x0:x1] as a contiguous 8-bit grayscale array (16-bit keeps the high byte)."""
+        import cv2
+        import numpy as np
+        if self._array is not None:
+            win = self._array[y0:y1, x0:x1]
+        else:
+            win = self._read_segments(x0, y0, x1, y1)
+        if win.dtype == np.uint16:
+            win = (win >> 8).astype(np.uint8)
+        if win.ndim == 3:
+            if win.shape[2] == 1:
+                win = win[..., 0]
+            else:
+                code = cv2.COLOR_BGR2GRAY if self._bgr else cv2.COLOR_RGB2GRAY
+                win = cv2.cvtColor(np.ascontiguousarray(win[..., :3]), code)
+        return np.ascontiguousarray(win)
+
+    def _read_segments(self, x0: int, y0: int, x1: int, y1: int):
+        """Decode the stored tiles/strips overlapping the window and copy their overlap into it."""
+        import numpy as np
+        page = self._page
+        seg_w, seg_h = self._segment_size()
+        across = -(-self.size[0] // seg_w)
+        out = np.empty((y1 - y0, x1 - x0) + tuple(self._shape[2:]), dtype=page.dtype)
+        for ty in range(y0 // seg_h, (y1 - 1) // seg_h + 1):
+            for tx in range(x0 // seg_w, (x1 - 1) // seg_w + 1):
+                index = ty * across + tx
+                data = os.pread(self._fd, page.databytecounts[index], page.dataoffsets[index])
+                segment, _, _ = page.decode(data, index, jpegtables=page.jpegtables)
+                segment = segment.reshape(segment.shape[-3:-1] + tuple(self._shape[2:]))
+                sy, sx = ty * seg_h, tx * seg_w
+                cy0, cy1 = max(y0, sy), min(y1, sy + segment.shape[0])
+                cx0, cx1 = max(x0, sx), min(x1, sx + segment.shape[1])
+                out[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0] = segment[cy0 - sy:cy1 - sy, cx0 - sx:cx1 - sx]
+        return out
+
+
+def find_wall_bbox_tiled(path: str, max_side: Optional[int] = None, tile: int = TILE_SIZE,
+                         workers: Optional[int] = None) -> Tuple[Tuple[int, int, int, int], Tuple[int, int]]:
+    """Return (wall bbox (x, y, w, h), image size (w, h)) of a ``TiledImage`` source, in full-resolution px.
+
+    Same steps as ``wall_measure.find_wall_bbox_front(img, max_side)``: the detection copy is assembled
+    from tiles downscaled independently (INTER_AREA), and each edge band is run through Canny in chunks
+    of ``tile`` px along the edge with ``TILE_OVERLAP`` px either side, whose edge counts are summed. Up
+    to ``workers`` tiles (default: number of CPUs) are in memory at once.
+    """
+    import numpy as np
+    max_side = max_side or TILED_MAX_SIDE
+    with TiledImage(path) as source, ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        w, h = source.size
+        ratio = wm._detection_ratio((w, h), max_side)
+        if ratio == 1.0:
+            return wm.find_wall_bbox_front(source.read_gray(0, 0, w, h)), (w, h)
+        small = np.empty((max(1, round(h * ratio)), max(1, round(w * ratio))), dtype=np.uint8)
+        for (ox0, oy0, ox1, oy1), piece in pool.map(lambda win: _shrink_window(source, win, ratio, small.shape),
+                                                    source.windows(tile)):
+            if piece is not None:
+                small[oy0:oy1, ox0:ox1] = piece
+        bbox = wm._detect_bbox_gray(small)
+        if bbox is None:
+            # fallback to whole image
+            return (0, 0, w, h), (w, h)
+        del small
+        mapped, bands = wm._refine_bands(bbox, ratio, (w, h))
+        chunks = [[pool.submit(_chunk_profile, source, band, chunk) for chunk in _band_chunks(band, tile)]
+                  for band in bands]
+        edges = []
+        for (lo, _, _, _, guess, outer), futures in zip(bands, chunks):
+            if not futures:
+                edges.append(guess)
+                continue
+            profile = sum(f.result() for f in futures)
+            edges.append(wm._strongest_line(profile, lo, guess, outer))
+        return wm._refined_bbox(mapped, edges), (w, h)
+
+
+def _shrink_window(source: TiledImage, window: Tuple[int, int, int, int], ratio: float,
+                   shape: Tuple[int, int]):
+    """Read one window and downscale it to its place in the detection copy: ((ox0, oy0, ox1, oy1), pixels)."""
+    import cv2
+    x0, y0, x1, y1 = window
+    ox0, oy0 = round(x0 * ratio), round(y0 * ratio)
+    ox1, oy1 = min(shape[1], round(x1 * ratio)), min(shape[0], round(y1 * ratio))
+    if ox1 <= ox0 or oy1 <= oy0:
+        return (ox0, oy0, ox1, oy1), None
+    piece = cv2.resize(source.read_gray(x0, y0, x1, y1), (ox1 - ox0, oy1 - oy0), interpolation=cv2.INTER_AREA)
+    return (ox0, oy0, ox1, oy1), piece
+
+
+def _band_chunks(band: tuple, tile: int) -> List[Tuple[int, int]]:
+    """[c0, c1) pieces of a ``_refine_bands`` band's span, ``tile`` px each (none for a degenerate band)."""
+    lo, hi, (s0, s1), _, _, _ = band
+    if hi - lo < 3 or s1 - s0 < 3:
+        return []
+    return [(c0, min(s1, c0 + tile)) for c0 in range(s0, s1, tile)]
+
+
+def _chunk_profile(source: TiledImage, band: tuple, chunk: Tuple[int, int]):
+    """``wall_measure._edge_profile`` of one chunk of a band, read with ``TILE_OVERLAP`` px of context."""
+    lo, hi, (s0, s1), axis, _, _ = band
+    c0, c1 = chunk
+    r0, r1 = max(s0, c0 - TILE_OVERLAP), min(s1, c1 + TILE_OVERLAP)
+    if axis == 1:
+        strip = source.read_gray(lo, r0, hi, r1)
+    else:
+        strip = source.read_gray(r0, lo, r1, hi)
+    return wm._edge_profile(strip, axis, slice(c0 - r0, c1 - r0))
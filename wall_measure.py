@@ -12,24 +12,93 @@ Usage examples are in README.md
 """
 from __future__ import annotations
 import math
+import os
+import sys
+import time
 import argparse
-from typing import Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
+
+__version__ = "0.2.0"
+
+# file extensions picked up by --batch when scanning a directory
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
+# cv2 imread flag names for each supported decode-time reduction factor (grayscale only:
+# wall detection never needs colour, and JPEG can skip the IDCT work for the dropped resolution)
+REDUCED_GRAY_FLAGS = {
+    1: "IMREAD_GRAYSCALE",
+    2: "IMREAD_REDUCED_GRAYSCALE_2",
+    4: "IMREAD_REDUCED_GRAYSCALE_4",
+    8: "IMREAD_REDUCED_GRAYSCALE_8",
+}
+
+# column order of the rows streamed by batch mode
+BATCH_FIELDS = ("path", "x_px", "y_px", "w_px", "h_px", "width_m", "height_m", "area_m2", "litres", "error")
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Estimate wall dimensions and paint needed from images")
-    p.add_argument("--front", required=True, help="Path to front view image (required)")
+    p.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    p.add_argument("--front", required=False, help="Path to front view image (required unless --batch/--manifest)")
     p.add_argument("--top", required=False, help="Path to top view image (optional, helps depth)")
     p.add_argument("--side", required=False, help="Path to side view image (optional, helps depth)")
     scale = p.add_mutually_exclusive_group(required=False)
     scale.add_argument("--scale", type=float, help="Direct scale in meters per pixel for the front image (preferred)")
     scale.add_argument("--ref", nargs=2, metavar=("REAL_M", "PX"),
                        help="Provide reference real-world length (meters) and its pixel length in the front image: e.g. --ref 1.0 120")
+    p.add_argument("--marker-size", type=float, default=None, metavar="METRES",
+                   help="Side length of a printed ArUco marker (or checkerboard square) in the front image; the "
+                        "scale is taken from it, --scale/--ref only apply when no marker is found")
+    p.add_argument("--checkerboard", type=_checkerboard_arg, default=None, metavar="COLSxROWS",
+                   help="Look for a checkerboard with this many inner corners (e.g. 7x5) instead of an ArUco marker")
+    p.add_argument("--aruco-dict", default=ARUCO_DICTIONARY,
+                   help=f"OpenCV ArUco dictionary of the printed marker (default: {ARUCO_DICTIONARY})")
     p.add_argument("--coverage", type=float, default=10.0,
                    help="Paint coverage in m^2 per litre (default: 10 m^2/L)")
     p.add_argument("--coats", type=float, default=2.0, help="Number of coats (default: 2)")
     p.add_argument("--no-round", dest="round_up", action="store_false",
                    help="Do not round liters up to whole litres (default is to round up)")
-    return p.parse_args()
+    p.add_argument("--openings", action="store_true",
+                   help="Detect windows and doors inside the wall and subtract their area before estimating paint")
+    p.add_argument("--perspective", action="store_true",
+                   help="Correct for photos taken at an angle: fit a quadrilateral to the wall outline and measure "
+                        "it rectified (the scale/reference applies at the wall's nearest edge)")
+    p.add_argument("--reduce", type=int, default=1, choices=sorted(REDUCED_GRAY_FLAGS),
+                   help="Decode images as grayscale reduced by this factor (1, 2, 4 or 8); pixel sizes are "
+                        "scaled back to full resolution before conversion to meters (default: 1, full colour decode)")
+    p.add_argument("--max-side", type=int, default=None, metavar="PX",
+                   help="Run edge detection on a copy downscaled to this long edge (e.g. 1024) and refine "
+                        "the bbox at full resolution; much faster on large photos (default: full resolution)")
+    p.add_argument("--tiled", action="store_true",
+                   help="Read very large images tile by tile (memory-mapped .npy, or TIFF via tifffile) on --jobs "
+                        "threads instead of decoding them whole; peak memory stays bounded")
+    batch = p.add_mutually_exclusive_group(required=False)
+    batch.add_argument("--batch", metavar="DIR",
+                       help="Measure every image in DIR (front views) and stream one CSV row per image")
+    batch.add_argument("--manifest", metavar="FILE",
+                       help="Measure the front-view images listed in FILE (one path per line, '#' comments allowed)")
+    p.add_argument("--socket", default=None,
+                   help="Unix socket of a running measure_daemon.py (default: $WALL_MEASURE_SOCKET or a per-user temp path)")
+    p.add_argument("--no-daemon", action="store_true",
+                   help="Always measure in this process, even if a measurement daemon is running")
+    p.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                   help="Worker processes for --batch/--manifest, threads for --tiled (default: number of CPUs)")
+    args = p.parse_args()
+    if not (args.front or args.batch or args.manifest):
+        p.error("--front is required unless --batch or --manifest is given")
+    if args.jobs < 1:
+        p.error("--jobs must be at least 1")
+    if args.openings and args.perspective:
+        p.error("--openings and --perspective cannot be combined")
+    if args.marker_size is not None and not (math.isfinite(args.marker_size) and args.marker_size > 0):
+        p.error("--marker-size must be a positive number")
+    if (args.marker_size is not None or args.checkerboard) and (args.batch or args.manifest):
+        p.error("--batch/--manifest need --scale or --ref; --marker-size and --checkerboard apply to "
+                "a single --front image")
+    if args.tiled and (args.openings or args.perspective or args.marker_size or args.reduce > 1
+                       or args.batch or args.manifest):
+        p.error("--tiled measures the wall bbox of single images; it cannot be combined with "
+                "--openings, --perspective, --marker-size, --reduce or --batch/--manifest")
+    return args
 
 
 def load_image_cv(path: str):
@@ -41,26 +110,649 @@ def load_image_cv(path: str):
     return img
 
 
-def find_wall_bbox_front(img) -> Tuple[int, int, int, int]:
-    """Return bounding rectangle (x, y, w, h) of the detected largest wall-like contour.
-    Uses simple Canny + contour area heuristic.
+def _reduced_gray_flag(reduce: int) -> int:
+    import cv2
+    if reduce not in REDUCED_GRAY_FLAGS:
+        raise ValueError(f"reduce must be one of {sorted(REDUCED_GRAY_FLAGS)}, got {reduce}")
+    return getattr(cv2, REDUCED_GRAY_FLAGS[reduce])
+
+
+def load_image_reduced(path: str, reduce: int = 1):
+    """Load ``path`` as a grayscale image downscaled by ``reduce`` at decode time.
+    Returns ``(img, factor)`` where ``factor`` maps image pixels back to full-resolution pixels.
+    """
+    import cv2
+    img = cv2.imread(path, _reduced_gray_flag(reduce))
+    if img is None:
+        raise FileNotFoundError(f"Cannot open image: {path}")
+    return img, reduce
+
+
+def decode_image_reduced(data, reduce: int = 1):
+    """Like ``load_image_reduced`` but for an encoded image buffer (bytes, memoryview, mmap or uint8 array).
+    Returns ``(img, factor)``; raises ValueError if the buffer cannot be decoded.
+    """
+    import cv2
+    import numpy as np
+    arr = data if isinstance(data, np.ndarray) else np.frombuffer(data, np.uint8)
+    img = cv2.imdecode(arr, _reduced_gray_flag(reduce))
+    del arr  # a traceback holding a view of an mmap would keep it from being closed
+    if img is None:
+        raise ValueError("Image could not be decoded")
+    return img, reduce
+
+
+def scale_bbox(bbox: Tuple[int, int, int, int], factor: int,
+               size: Optional[Tuple[int, int]] = None) -> Tuple[int, int, int, int]:
+    """Map a bbox found on a reduced image back to full-resolution pixels, clipped to ``size`` (w, h)."""
+    x, y, w, h = (int(v) * factor for v in bbox)
+    if size is not None:
+        full_w, full_h = size
+        x, y = min(x, full_w), min(y, full_h)
+        w, h = min(w, full_w - x), min(h, full_h - y)
+    return x, y, w, h
+
+
+def _load_for_detection(path: str, reduce: int = 1):
+    """(img, factor, full-resolution size (w, h)) of ``path``: reduced grayscale when ``reduce`` > 1, where
+    ``factor`` maps its pixels back to full resolution, else the colour image and factor 1.
+    """
+    if reduce > 1:
+        img, factor = load_image_reduced(path, reduce)
+    else:
+        img, factor = load_image_cv(path), 1
+    h, w = img.shape[:2]
+    return img, factor, (w * factor, h * factor)
+
+
+def detect_wall_bbox_path(path: str, max_side: Optional[int] = None, reduce: int = 1) -> Tuple[int, int, int, int]:
+    """Load ``path`` and return its wall bbox (x, y, w, h) in full-resolution pixels.
+    With ``reduce`` > 1 the image is decoded as reduced grayscale and the bbox scaled back up.
+    """
+    img, factor, size = _load_for_detection(path, reduce)
+    return scale_bbox(find_wall_bbox_front(img, max_side), factor, size)
+
+
+def detect_wall_bbox_tiled_path(path: str, max_side: Optional[int] = None, reduce: int = 1,
+                                workers: Optional[int] = None) -> Tuple[int, int, int, int]:
+    """``detect_wall_bbox_path`` for images too large to decode whole, read tile by tile with
+    ``tiles.find_wall_bbox_tiled`` (.npy or TIFF; ``reduce`` does not apply).
     """
+    import tiles
+    return tiles.find_wall_bbox_tiled(path, max_side, workers=workers)[0]
+
+
+def detect_wall_openings_path(path: str, max_side: Optional[int] = None, reduce: int = 1
+                              ) -> Tuple[Tuple[int, int, int, int], List[Tuple[int, int, int, int]]]:
+    """``detect_wall_bbox_path`` for ``find_wall_bbox_and_openings``: returns (wall bbox, openings)
+    in full-resolution pixels.
+    """
+    img, factor, size = _load_for_detection(path, reduce)
+    bbox, openings = find_wall_bbox_and_openings(img, max_side)
+    return scale_bbox(bbox, factor, size), [scale_bbox(o, factor, size) for o in openings]
+
+
+def detect_wall_quad_path(path: str, max_side: Optional[int] = None, reduce: int = 1
+                          ) -> Tuple[Tuple[int, int, int, int], Optional[List[Tuple[float, float]]], Tuple[int, int]]:
+    """``detect_wall_bbox_path`` for ``find_wall_bbox_and_quad``: returns (wall bbox, quad or None,
+    image size (w, h)) in full-resolution pixels.
+    """
+    img, factor, size = _load_for_detection(path, reduce)
+    bbox, quad = find_wall_bbox_and_quad(img, max_side)
+    if quad is not None and factor > 1:
+        quad = [(px * factor, py * factor) for px, py in quad]
+    return scale_bbox(bbox, factor, size), quad, size
+
+
+def _edge_contours(gray):
+    """Blur + Canny + external contours of a grayscale image."""
     import cv2
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     # blur then Canny
     gray = cv2.GaussianBlur(gray, (5, 5), 0)
     edges = cv2.Canny(gray, 50, 150)
     contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return contours
+
+
+def _detect_bbox_gray(gray) -> Optional[Tuple[int, int, int, int]]:
+    """Largest external contour's bounding rect on a grayscale image; None when no contour is found."""
+    return _select_wall_contour(_edge_contours(gray))
+
+
+def _select_wall_contour(contours) -> Optional[Tuple[int, int, int, int]]:
+    """Bounding rect of the contour with the largest area; None for an empty list."""
+    import cv2
     if not contours:
-        # fallback to whole image
-        h, w = img.shape[:2]
-        return 0, 0, w, h
-    # pick contour with largest area
-    c = max(contours, key=cv2.contourArea)
-    x, y, w, h = cv2.boundingRect(c)
+        return None
+    x, y, w, h = cv2.boundingRect(contours[_largest_contour_index(contours)])
     return x, y, w, h
 
 
+def _largest_contour_index(contours) -> int:
+    """Index of the contour with the largest area in a non-empty list.
+
+    Same choice as ``max(contours, key=cv2.contourArea)`` (first contour wins ties). For the speckle
+    edge maps of textured walls (thousands of contours of a few points each) the areas are computed in
+    one NumPy pass instead of one cv2 call per contour; integer coordinates keep them bit-identical.
+    """
+    import cv2
+    import numpy as np
+    if len(contours) >= _BULK_SELECT_MIN:
+        lengths = np.fromiter(map(len, contours), dtype=np.int64, count=len(contours))
+        if lengths.sum() <= _BULK_SELECT_MAX_POINTS * len(contours):
+            return int(_contour_areas(contours, lengths).argmax())
+    # pick contour with largest area
+    return max(range(len(contours)), key=lambda i: cv2.contourArea(contours[i]))
+
+
+# the bulk pass only beats the per-contour loop for many contours with few points each
+_BULK_SELECT_MIN = 1024
+_BULK_SELECT_MAX_POINTS = 8
+
+
+def _contour_areas(contours, lengths=None):
+    """Absolute polygon areas of all ``contours`` (findContours output) as one float64 array,
+    equal to ``cv2.contourArea`` of each. ``lengths`` (points per contour) is computed if not given.
+    """
+    import numpy as np
+    if lengths is None:
+        lengths = np.fromiter(map(len, contours), dtype=np.int64, count=len(contours))
+    pts = np.concatenate(contours).reshape(-1, 2)
+    x = pts[:, 0].astype(np.float64)
+    y = pts[:, 1].astype(np.float64)
+    starts = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    ends = starts + lengths - 1
+    # shoelace terms between consecutive points, then close each polygon (last vertex -> first)
+    cross = np.empty_like(x)
+    np.subtract(x[:-1] * y[1:], x[1:] * y[:-1], out=cross[:-1])
+    cross[ends] = x[ends] * y[starts] - x[starts] * y[ends]
+    return np.abs(np.add.reduceat(cross, starts)) / 2.0
+
+
+def _contour_boxes(contours):
+    """Bounding rects (x, y, w, h) of all ``contours`` as an int64 array, equal to ``cv2.boundingRect`` of each."""
+    import numpy as np
+    lengths = np.fromiter(map(len, contours), dtype=np.int64, count=len(contours))
+    pts = np.concatenate(contours).reshape(-1, 2).astype(np.int64)
+    starts = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    lo = np.minimum.reduceat(pts, starts)
+    hi = np.maximum.reduceat(pts, starts)
+    return np.concatenate([lo, hi - lo + 1], axis=1)
+
+
+def _refine_edge(gray, lo: int, hi: int, span: Tuple[int, int], axis: int, guess: int, outer: bool) -> int:
+    """Locate the wall edge line in the band [lo, hi) of ``gray`` at full resolution.
+    ``axis`` is 1 for a vertical edge (search over columns) and 0 for a horizontal one (rows);
+    ``span`` limits the other axis to the extent of the bbox. Like ``boundingRect`` on the full-size
+    edge map, the outermost well-supported line wins (the last one when ``outer``, else the first).
+    Falls back to ``guess``.
+    """
+    s0, s1 = span
+    if hi - lo < 3 or s1 - s0 < 3:
+        return guess
+    strip = gray[s0:s1, lo:hi] if axis == 1 else gray[lo:hi, s0:s1]
+    return _strongest_line(_edge_profile(strip, axis), lo, guess, outer)
+
+
+def _edge_profile(strip, axis: int, keep: slice = slice(None)):
+    """Edge pixels per candidate line of a band, i.e. counted along the edge direction (only over the
+    ``keep`` part of that direction).
+    """
+    import cv2
+    edges = cv2.Canny(cv2.GaussianBlur(strip, (5, 5), 0), 50, 150)
+    if axis == 1:
+        return edges[keep].sum(axis=0)
+    return edges[:, keep].sum(axis=1)
+
+
+def _strongest_line(profile, lo: int, guess: int, outer: bool) -> int:
+    """The outermost line of ``_edge_profile`` with at least half the best support, offset by ``lo``."""
+    if not profile.any():
+        return guess
+    strong = (profile * 2 >= profile.max()).nonzero()[0]
+    return lo + int(strong[-1] if outer else strong[0])
+
+
+# the detection copy keeps at least this many px on its short side (blur + Canny need a few rows), so thin
+# strips are downscaled less than max_side asks, or not at all
+_MIN_DETECT_SIDE = 32
+
+
+def _detection_ratio(size: Tuple[int, int], max_side: Optional[int]) -> float:
+    """Scale of the detection copy of a (w, h) image: fits ``max_side`` unless that would leave fewer than
+    ``_MIN_DETECT_SIDE`` px on the short side; 1.0 when no downscale is needed.
+    """
+    long_side, short_side = max(size), min(size)
+    if not max_side or long_side <= max_side:
+        return 1.0
+    ratio = max(max_side / float(long_side), _MIN_DETECT_SIDE / float(max(short_side, 1)))
+    return 1.0 if ratio >= 1.0 else ratio
+
+
+def _detection_images(img, max_side: Optional[int]):
+    """Return (full-res gray, gray used for detection, detection/full-res ratio)."""
+    import cv2
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    h_img, w_img = gray.shape[:2]
+    ratio = _detection_ratio((w_img, h_img), max_side)
+    if ratio == 1.0:
+        return gray, gray, 1.0
+    small = cv2.resize(gray, (max(1, round(w_img * ratio)), max(1, round(h_img * ratio))),
+                       interpolation=cv2.INTER_AREA)
+    return gray, small, ratio
+
+
+def _refine_bbox(gray, bbox: Tuple[int, int, int, int], ratio: float) -> Tuple[int, int, int, int]:
+    """Map a bbox found at ``ratio`` of full resolution back to ``gray`` and refine its edges there."""
+    if ratio == 1.0:
+        return bbox
+    h_img, w_img = gray.shape[:2]
+    mapped, bands = _refine_bands(bbox, ratio, (w_img, h_img))
+    return _refined_bbox(mapped, [_refine_edge(gray, *band) for band in bands])
+
+
+def _refine_bands(bbox: Tuple[int, int, int, int], ratio: float, size: Tuple[int, int]):
+    """The bbox found at ``ratio`` mapped to full resolution as inclusive (x0, y0, x1, y1), plus the
+    ``_refine_edge`` arguments (lo, hi, span, axis, guess, outer) of its left, right, top and bottom edges.
+    """
+    w_img, h_img = size
+    sx, sy, sw, sh = bbox
+    inv = 1.0 / ratio
+    x0 = min(w_img - 1, int(sx * inv))
+    y0 = min(h_img - 1, int(sy * inv))
+    x1 = min(w_img - 1, max(x0, int(math.ceil((sx + sw) * inv)) - 1))
+    y1 = min(h_img - 1, max(y0, int(math.ceil((sy + sh) * inv)) - 1))
+
+    # one downscaled pixel plus the blur/Canny footprint either side of each mapped edge
+    band = int(math.ceil(inv)) + 3
+    rows = (y0, y1 + 1)
+    cols = (x0, x1 + 1)
+    return (x0, y0, x1, y1), [
+        (max(0, x0 - band), min(w_img, x0 + band + 1), rows, 1, x0, False),
+        (max(0, x1 - band), min(w_img, x1 + band + 1), rows, 1, x1, True),
+        (max(0, y0 - band), min(h_img, y0 + band + 1), cols, 0, y0, False),
+        (max(0, y1 - band), min(h_img, y1 + band + 1), cols, 0, y1, True),
+    ]
+
+
+def _refined_bbox(mapped: Tuple[int, int, int, int], edges: List[int]) -> Tuple[int, int, int, int]:
+    """(x, y, w, h) from the refined left, right, top and bottom edges, keeping the mapped
+    (x0, y0, x1, y1) on an axis where they crossed.
+    """
+    x0, y0, x1, y1 = mapped
+    left, right, top, bottom = edges
+    if right < left:
+        left, right = x0, x1
+    if bottom < top:
+        top, bottom = y0, y1
+    return left, top, right - left + 1, bottom - top + 1
+
+
+def find_wall_bbox_front(img, max_side: Optional[int] = None) -> Tuple[int, int, int, int]:
+    """Return bounding rectangle (x, y, w, h) of the detected largest wall-like contour.
+    Uses simple Canny + contour area heuristic.
+
+    When ``max_side`` is given and the image's long edge exceeds it, the contour search runs on a
+    copy downscaled to ``max_side`` and the bbox is mapped back and refined at full resolution
+    within a thin band around each of its four edges (thin strips keep ``_MIN_DETECT_SIDE`` px on their
+    short side). The result is always in original pixels.
+    """
+    gray, small, ratio = _detection_images(img, max_side)
+    bbox = _detect_bbox_gray(small)
+    if bbox is None:
+        # fallback to whole image
+        h_img, w_img = gray.shape[:2]
+        return 0, 0, w_img, h_img
+    return _refine_bbox(gray, bbox, ratio)
+
+
+def find_wall_candidates(img, k: int = 5, max_side: Optional[int] = None,
+                         min_area_frac: float = 0.01, max_overlap: float = 0.5) -> List[dict]:
+    """Return up to ``k`` wall-like regions, largest first, from one pass over the edge map.
+
+    Each candidate is ``{"bbox": (x, y, w, h), "area_px": contour area, "confidence": 0..1}`` in
+    original pixels, where confidence is how much of its bbox the contour fills (1.0 for a clean
+    rectangle). The first candidate is exactly what ``find_wall_bbox_front`` returns (whole image,
+    confidence 0, when nothing is found); further ones must cover ``min_area_frac`` of the image and
+    overlap earlier candidates by at most ``max_overlap`` of their own bbox area.
+    """
+    import cv2
+    import numpy as np
+    gray, small, ratio = _detection_images(img, max_side)
+    h_img, w_img = gray.shape[:2]
+    contours = _edge_contours(small)
+    if not contours:
+        return [{"bbox": (0, 0, w_img, h_img), "area_px": float(w_img * h_img), "confidence": 0.0}]
+
+    areas = _contour_areas(contours)
+    # stable sort keeps max()'s first-wins tie order for the top candidate
+    order = np.argsort(-areas, kind="stable")
+    min_area = min_area_frac * small.shape[0] * small.shape[1]
+    scale_area = 1.0 / (ratio * ratio)
+    out: List[dict] = []
+    for idx in order:
+        if len(out) >= k:
+            break
+        area = float(areas[idx])
+        if out and area < min_area:
+            break
+        sbox = tuple(int(v) for v in cv2.boundingRect(contours[idx]))
+        if any(_overlap_frac(sbox, prev) > max_overlap for prev in (c["_small"] for c in out)):
+            continue
+        box_area = sbox[2] * sbox[3]
+        out.append({
+            "bbox": _refine_bbox(gray, sbox, ratio),
+            "area_px": area * scale_area,
+            "confidence": round(min(1.0, area / box_area), 3) if box_area else 0.0,
+            "_small": sbox,
+        })
+    for c in out:
+        del c["_small"]
+    return out
+
+
+def find_wall_bbox_and_openings(img, max_side: Optional[int] = None, min_area_frac: float = 0.005,
+                                max_area_frac: float = 0.5, min_fill: float = 0.8
+                                ) -> Tuple[Tuple[int, int, int, int], List[Tuple[int, int, int, int]]]:
+    """Return (wall bbox, openings): the bbox ``find_wall_bbox_front`` finds plus the rectangular
+    openings (windows, doors) inside it as (x, y, w, h) boxes, largest first, in original pixels.
+
+    The edge map is traced once with the full contour hierarchy instead of RETR_EXTERNAL: the wall
+    is the largest top-level contour and openings are its descendants whose bbox covers
+    ``min_area_frac``..``max_area_frac`` of the wall bbox (the wall's own inner outline is larger).
+    A closed outline must fill ``min_fill`` of its bbox; an open one counts as a door when it runs
+    up one side, across and down the other and ends on the wall's bottom edge (Canny rarely joins
+    the door jambs to the floor line). Nested outlines such as frames and panes count once.
+    """
+    import cv2
+    import numpy as np
+    gray, small, ratio = _detection_images(img, max_side)
+    h_img, w_img = gray.shape[:2]
+    contours, hierarchy = _edge_tree(small)
+    if not contours:
+        return (0, 0, w_img, h_img), []
+    hierarchy = hierarchy[0]
+    top = np.flatnonzero(hierarchy[:, 3] < 0)
+    wall = int(top[_largest_contour_index([contours[i] for i in top])])
+    wx, wy, ww, wh = (int(v) for v in cv2.boundingRect(contours[wall]))
+    bbox = _refine_bbox(gray, (wx, wy, ww, wh), ratio)
+
+    inner = _descendants(hierarchy, wall)
+    if not inner:
+        return bbox, []
+    inner_contours = [contours[i] for i in inner]
+    areas = _contour_areas(inner_contours)
+    boxes = _contour_boxes(inner_contours)
+    box_areas = boxes[:, 2] * boxes[:, 3]
+    wall_area = ww * wh
+    keep = np.flatnonzero((box_areas >= min_area_frac * wall_area) & (box_areas <= max_area_frac * wall_area))
+    floor = wy + wh - _OPENING_FLOOR_GAP
+    found: List[Tuple[int, int, int, int]] = []
+    for j in keep[np.argsort(-box_areas[keep], kind="stable")]:
+        box = tuple(int(v) for v in boxes[j])
+        if areas[j] < min_fill * box_areas[j]:
+            # open outline: a door is traced along both sides of its jambs and lintel
+            door_len = 2 * (box[2] + 2 * box[3])
+            if box[1] + box[3] < floor or cv2.arcLength(inner_contours[j], False) < min_fill * door_len:
+                continue
+        # the outer and inner outline of one edge loop (or a frame around a pane) nest
+        if any(_overlap_frac(box, prev) > 0.9 for prev in found):
+            continue
+        found.append(box)
+
+    x0, y0, w, h = bbox
+    openings = []
+    for box in found:
+        ox, oy, ow, oh = _refine_bbox(gray, box, ratio)
+        # clip to the wall so an opening never removes more than the wall has
+        ox1, oy1 = min(ox + ow, x0 + w), min(oy + oh, y0 + h)
+        ox, oy = max(ox, x0), max(oy, y0)
+        if ox1 > ox and oy1 > oy:
+            openings.append((ox, oy, ox1 - ox, oy1 - oy))
+    return bbox, openings
+
+
+# an open door outline may stop this many (detection) px above the wall's bottom edge
+_OPENING_FLOOR_GAP = 4
+
+
+def find_wall_bbox_and_quad(img, max_side: Optional[int] = None
+                            ) -> Tuple[Tuple[int, int, int, int], Optional[List[Tuple[float, float]]]]:
+    """Return (wall bbox, quad): the bbox ``find_wall_bbox_front`` finds plus the wall outline as a
+    quadrilateral [top-left, top-right, bottom-right, bottom-left] of (x, y) points in original
+    pixels, or None when the outline is not four-sided.
+
+    The quadrilateral is a polygon approximation of the same contour's convex hull at detection
+    resolution; its corners are then refined to sub-pixel accuracy on the full-resolution image.
+    """
+    import cv2
+    import numpy as np
+    gray, small, ratio = _detection_images(img, max_side)
+    h_img, w_img = gray.shape[:2]
+    contours = _edge_contours(small)
+    if not contours:
+        return (0, 0, w_img, h_img), None
+    contour = contours[_largest_contour_index(contours)]
+    bbox = _refine_bbox(gray, tuple(int(v) for v in cv2.boundingRect(contour)), ratio)
+
+    hull = cv2.convexHull(contour)
+    perimeter = cv2.arcLength(hull, True)
+    approx = None
+    for eps in _QUAD_EPSILONS:
+        approx = cv2.approxPolyDP(hull, eps * perimeter, True)
+        if len(approx) <= 4:
+            break
+    if approx is None or len(approx) != 4:
+        return bbox, None
+    pts = approx.reshape(4, 2).astype(np.float32) / np.float32(ratio)
+    win = int(math.ceil(1.0 / ratio)) + 2
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 0.05)
+    pts = cv2.cornerSubPix(gray, pts.reshape(-1, 1, 2).copy(), (win, win), (-1, -1), criteria).reshape(4, 2)
+    # order corners: top-left has the smallest x + y, bottom-right the largest, and so on
+    s = pts.sum(axis=1)
+    d = pts[:, 1] - pts[:, 0]
+    order = (int(s.argmin()), int(d.argmin()), int(s.argmax()), int(d.argmax()))
+    if len(set(order)) != 4:
+        return bbox, None
+    return bbox, [(float(pts[i, 0]), float(pts[i, 1])) for i in order]
+
+
+# focal length assumed when it cannot be estimated, and the accepted range (x long image side)
+_DEFAULT_FOCAL = 0.8
+_FOCAL_RANGE = (0.3, 3.0)
+# opposite edges closer than this to parallel (degrees) leave the focal length undetermined
+_MIN_CONVERGENCE = 2.0
+
+# polygon approximation tolerances (fraction of hull perimeter) tried in turn for a four-sided outline
+_QUAD_EPSILONS = (0.01, 0.02, 0.04)
+
+
+def rectify_quad(quad: List[Tuple[float, float]], image_size: Tuple[int, int],
+                 focal_px: Optional[float] = None) -> Tuple[float, float, List[List[float]]]:
+    """Size of the wall quadrilateral ``quad`` (tl, tr, br, bl) seen head-on, and the homography.
+
+    The width/height ratio of the real rectangle is recovered from the four corners with the
+    pinhole model of Zhang & He ("Whiteboard scanning and image enhancement"), taking the principal
+    point at the centre of ``image_size`` (w, h). The focal length ``focal_px`` is estimated from the
+    corners too, but that needs both pairs of opposite edges to converge; for the common shot with
+    vertical edges still parallel (or an implausible estimate) a typical phone camera's focal length,
+    0.8 x the long image side, is assumed. The rectified rectangle keeps the pixel length
+    of the longest quad edge, i.e. the part of the wall nearest the camera, so ``px_to_meters`` with a
+    scale or reference taken there applies unchanged. Returns (width_px, height_px, H) where H
+    (3x3 nested lists) maps image pixels to the rectified frame.
+    """
+    import cv2
+    import numpy as np
+    q = np.asarray(quad, dtype=np.float64)
+    tl, tr, br, bl = q
+    cx, cy = image_size[0] / 2.0, image_size[1] / 2.0
+    m1, m2, m3, m4 = (np.array([p[0] - cx, p[1] - cy, 1.0]) for p in (tl, tr, bl, br))
+    k2 = np.dot(np.cross(m1, m4), m3) / np.dot(np.cross(m2, m4), m3)
+    k3 = np.dot(np.cross(m1, m4), m2) / np.dot(np.cross(m3, m4), m2)
+    n2 = k2 * m2 - m1
+    n3 = k3 * m3 - m1
+    long_side = max(image_size)
+    if focal_px is None:
+        f2 = -(n2[0] * n3[0] + n2[1] * n3[1]) / (n2[2] * n3[2]) if n2[2] * n3[2] != 0 else 0.0
+        focal_px = math.sqrt(f2) if f2 > 0 else 0.0
+        # with a pair of edges within pixel noise of parallel the estimate is meaningless
+        if min(_edge_angle(tr - tl, br - bl), _edge_angle(bl - tl, br - tr)) < _MIN_CONVERGENCE:
+            focal_px = 0.0
+        if not _FOCAL_RANGE[0] * long_side <= focal_px <= _FOCAL_RANGE[1] * long_side:
+            focal_px = _DEFAULT_FOCAL * long_side
+    f2 = focal_px * focal_px
+    aspect = math.sqrt((n2[0] ** 2 / f2 + n2[1] ** 2 / f2 + n2[2] ** 2)
+                       / (n3[0] ** 2 / f2 + n3[1] ** 2 / f2 + n3[2] ** 2))
+
+    width = max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))
+    height = max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))
+    if width / aspect >= height:
+        height = width / aspect
+    else:
+        width = height * aspect
+    dst = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float32)
+    homography = cv2.getPerspectiveTransform(q.astype(np.float32), dst)
+    return float(width), float(height), homography.tolist()
+
+
+def _edge_angle(u, v) -> float:
+    """Angle in degrees between two 2-D direction vectors."""
+    cos = abs(float(u[0] * v[0] + u[1] * v[1])) / (math.hypot(u[0], u[1]) * math.hypot(v[0], v[1]))
+    return math.degrees(math.acos(min(1.0, cos)))
+
+
+def _edge_tree(gray):
+    """Like ``_edge_contours`` but with every contour and the full hierarchy (RETR_TREE)."""
+    import cv2
+    edges = cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 50, 150)
+    return cv2.findContours(edges, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+
+
+def _descendants(hierarchy, idx: int) -> List[int]:
+    """Indices of all contours nested inside contour ``idx`` (rows are [next, prev, child, parent])."""
+    out = []
+    stack = [int(hierarchy[idx][2])]
+    while stack:
+        i = stack.pop()
+        while i >= 0:
+            out.append(i)
+            if hierarchy[i][2] >= 0:
+                stack.append(int(hierarchy[i][2]))
+            i = int(hierarchy[i][0])
+    return out
+
+
+def openings_area_m2(openings: List[Tuple[int, int, int, int]], scale: Optional[float],
+                     ref: Optional[Tuple[float, float]]) -> float:
+    """Total area in m^2 of opening boxes (x, y, w, h) in px."""
+    return sum(px_to_meters(w, scale, ref) * px_to_meters(h, scale, ref) for _, _, w, h in openings)
+
+
+def _overlap_frac(a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -> float:
+    """Fraction of bbox ``a``'s area that lies inside bbox ``b``."""
+    ix = max(0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+    area = a[2] * a[3]
+    return ix * iy / area if area else 1.0
+
+
+# OpenCV ArUco dictionary printed markers are looked up in by default
+ARUCO_DICTIONARY = "DICT_4X4_50"
+# markers are searched on a copy downscaled to this long edge unless another max_side is given
+MARKER_MAX_SIDE = 1600
+
+
+def detect_scale_marker_path(path: str, checkerboard: Optional[Tuple[int, int]] = None,
+                             dictionary: str = ARUCO_DICTIONARY, max_side: Optional[int] = None) -> Optional[dict]:
+    """``find_scale_marker`` on the image at ``path``, always decoded as full-resolution grayscale
+    (independently of ``--reduce``, since the corners are refined at full resolution).
+    """
+    gray, _ = load_image_reduced(path, 1)
+    return find_scale_marker(gray, checkerboard, dictionary, max_side)
+
+
+def find_scale_marker(img, checkerboard: Optional[Tuple[int, int]] = None, dictionary: str = ARUCO_DICTIONARY,
+                      max_side: Optional[int] = None) -> Optional[dict]:
+    """Find a printed scale marker: the largest ArUco marker of ``dictionary``, or with ``checkerboard``
+    = (columns, rows) of inner corners a checkerboard of that size. Returns None when there is none, else
+    ``{"kind", "id", "corners", "side_px"}``: the marker id (None for a checkerboard), its corners in
+    original pixels and the mean length of one marker side (one checkerboard square) in pixels.
+
+    The search runs on a copy downscaled to ``max_side`` (default ``MARKER_MAX_SIDE``) and the corners
+    found there are refined to sub-pixel accuracy on the full-resolution image.
+    """
+    import cv2
+    import numpy as np
+    gray, small, ratio = _detection_images(img, max_side or MARKER_MAX_SIDE)
+    if checkerboard is not None:
+        cols, rows = checkerboard
+        flags = cv2.CALIB_CB_ADAPTIVE_THRESH | cv2.CALIB_CB_NORMALIZE_IMAGE | cv2.CALIB_CB_FAST_CHECK
+        found, corners = cv2.findChessboardCorners(small, (cols, rows), flags=flags)
+        if not found:
+            return None
+        pts = _refine_corners(gray, corners.reshape(-1, 2) / np.float32(ratio), ratio).reshape(rows, cols, 2)
+        steps = np.concatenate([np.linalg.norm(np.diff(pts, axis=1), axis=2).ravel(),
+                                np.linalg.norm(np.diff(pts, axis=0), axis=2).ravel()])
+        return {"kind": "checkerboard", "id": None,
+                "corners": [[float(x), float(y)] for x, y in (pts[0, 0], pts[0, -1], pts[-1, -1], pts[-1, 0])],
+                "side_px": float(steps.mean())}
+
+    if not hasattr(cv2, "aruco"):
+        raise RuntimeError("ArUco markers need opencv-contrib-python (or OpenCV >= 4.7)")
+    if not hasattr(cv2.aruco, dictionary):
+        raise ValueError(f"unknown ArUco dictionary: {dictionary}")
+    aruco_dict = cv2.aruco.getPredefinedDictionary(getattr(cv2.aruco, dictionary))
+    if hasattr(cv2.aruco, "ArucoDetector"):
+        corners, ids, _ = cv2.aruco.ArucoDetector(aruco_dict, cv2.aruco.DetectorParameters()).detectMarkers(small)
+    else:
+        corners, ids, _ = cv2.aruco.detectMarkers(small, aruco_dict)
+    if ids is None or not len(corners):
+        return None
+    best = max(range(len(corners)), key=lambda i: cv2.arcLength(corners[i].reshape(-1, 1, 2), True))
+    pts = _refine_corners(gray, corners[best].reshape(4, 2) / np.float32(ratio), ratio)
+    sides = np.linalg.norm(pts - np.roll(pts, -1, axis=0), axis=1)
+    return {"kind": "aruco", "id": int(np.asarray(ids).ravel()[best]),
+            "corners": [[float(x), float(y)] for x, y in pts], "side_px": float(sides.mean())}
+
+
+def _refine_corners(gray, pts, ratio: float):
+    """Sub-pixel refinement on ``gray`` of (N, 2) corner estimates found at ``ratio`` of its resolution."""
+    import cv2
+    import numpy as np
+    win = int(math.ceil(1.0 / ratio)) + 2
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.01)
+    pts = np.ascontiguousarray(pts, dtype=np.float32).reshape(-1, 1, 2)
+    return cv2.cornerSubPix(gray, pts, (win, win), (-1, -1), criteria).reshape(-1, 2)
+
+
+def marker_scale(marker: dict, marker_m: float) -> float:
+    """Meters per pixel from a ``find_scale_marker`` result whose side (square) is ``marker_m`` long."""
+    if marker["side_px"] <= 0:
+        raise ValueError("scale marker has zero size")
+    return marker_m / marker["side_px"]
+
+
+def parse_checkerboard(spec: str) -> Tuple[int, int]:
+    """'COLSxROWS' (inner corners, e.g. '7x5') -> (cols, rows)."""
+    try:
+        cols, rows = (int(v) for v in spec.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"checkerboard must be COLSxROWS inner corners, e.g. 7x5, got {spec!r}") from None
+    if cols < 2 or rows < 2:
+        raise ValueError(f"checkerboard needs at least 2x2 inner corners, got {spec!r}")
+    return cols, rows
+
+
+def _checkerboard_arg(spec: str) -> Tuple[int, int]:
+    """``parse_checkerboard`` for argparse, which shows ArgumentTypeError messages but not ValueError ones."""
+    try:
+        return parse_checkerboard(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
 def px_to_meters(px: float, scale: Optional[float], ref: Optional[Tuple[float, float]]) -> float:
     """Convert pixels to meters using either direct scale (m per px) or reference (meters, px)."""
     if scale is not None:
@@ -78,6 +770,352 @@ def estimate_paint_litres(area_m2: float, coverage_m2_per_l: float, coats: float
     return round(litres, 2)
 
 
+def px_to_meters_array(px, scale=None, ref=None):
+    """Vectorised ``px_to_meters`` over NumPy arrays.
+    ``px``, ``scale`` and both parts of ``ref`` (real_m, px_len) may be scalars or arrays and broadcast
+    together; values are bit-identical to the scalar function and errors are the same exception types.
+    """
+    import numpy as np
+    px = np.asarray(px, dtype=np.float64)
+    if scale is not None:
+        return px * np.asarray(scale, dtype=np.float64)
+    if ref is not None:
+        real_m, px_len = (np.asarray(v, dtype=np.float64) for v in ref)
+        if np.any(px_len == 0):
+            raise ZeroDivisionError("float division by zero")
+        return px * (real_m / px_len)
+    raise ValueError("Either scale or ref must be provided to convert pixels to meters")
+
+
+def estimate_paint_litres_array(area_m2, coverage_m2_per_l, coats, round_up: bool = True):
+    """Vectorised ``estimate_paint_litres`` over NumPy arrays (arguments broadcast together).
+    Returns a float64 array holding exactly the values the scalar function returns element-wise
+    (whole litres when ``round_up``, otherwise Python ``round(litres, 2)`` semantics).
+    """
+    import numpy as np
+    area_m2 = np.asarray(area_m2, dtype=np.float64)
+    coverage = np.asarray(coverage_m2_per_l, dtype=np.float64)
+    coats = np.asarray(coats, dtype=np.float64)
+    if np.any(coverage == 0):
+        raise ZeroDivisionError("float division by zero")
+    litres = (area_m2 * coats) / coverage
+    if round_up:
+        # math.ceil refuses non-finite values
+        if np.isnan(litres).any():
+            raise ValueError("cannot convert float NaN to integer")
+        if np.isinf(litres).any():
+            raise OverflowError("cannot convert float infinity to integer")
+        return np.ceil(litres)
+    return _round_array(litres, 2)
+
+
+def _round_array(values, ndigits: int):
+    """``round(v, ndigits)`` element-wise over a float64 array, with Python's exact results."""
+    import numpy as np
+    out = np.round(values, ndigits)
+    # np.round scales by 10**ndigits before rounding, which can disagree with Python's correctly rounded
+    # round() next to a half-way point or for huge values; redo just those elements in Python
+    scaled = np.abs(values * 10.0 ** ndigits)
+    suspect = (np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6) | (scaled >= 1e10)
+    if suspect.any():
+        out = np.array(out, dtype=np.float64, copy=True)
+        out[suspect] = [round(float(v), ndigits) for v in values[suspect]]
+    return out
+
+
+def iter_batch_paths(batch_dir: Optional[str] = None, manifest: Optional[str] = None) -> Iterator[str]:
+    """Yield image paths from a directory (sorted, by extension) or a manifest file.
+    Relative paths in a manifest are resolved against the manifest's directory.
+    """
+    if batch_dir is not None:
+        for name in sorted(os.listdir(batch_dir)):
+            path = os.path.join(batch_dir, name)
+            if name.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(path):
+                yield path
+        return
+    if manifest is not None:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                yield line if os.path.isabs(line) else os.path.join(base, line)
+
+
+def measure_front_image(path: str, scale: Optional[float], ref: Optional[Tuple[float, float]],
+                        coverage: float, coats: float, round_up: bool = True,
+                        max_side: Optional[int] = None, reduce: int = 1) -> dict:
+    """Run load + detection + paint estimate for one front image and return a flat result row.
+    Errors are reported in the ``error`` field instead of raised so one bad file cannot stop a batch.
+    """
+    row = dict.fromkeys(BATCH_FIELDS)
+    row["path"] = path
+    try:
+        x, y, w_px, h_px = detect_wall_bbox_path(path, max_side, reduce)
+        row.update(x_px=int(x), y_px=int(y), w_px=int(w_px), h_px=int(h_px))
+        width_m = px_to_meters(w_px, scale, ref)
+        height_m = px_to_meters(h_px, scale, ref)
+        area_m2 = width_m * height_m
+        row.update(width_m=round(width_m, 3), height_m=round(height_m, 3), area_m2=round(area_m2, 3),
+                   litres=estimate_paint_litres(area_m2, coverage, coats, round_up))
+    except Exception as ex:
+        row["error"] = f"{type(ex).__name__}: {ex}"
+    return row
+
+
+def _batch_worker_init():
+    # one OpenCV thread per worker process: the pool already provides the parallelism
+    import cv2
+    cv2.setNumThreads(1)
+
+
+def _batch_worker(task: tuple) -> dict:
+    return measure_front_image(*task)
+
+
+def run_batch(paths: List[str], scale: Optional[float], ref: Optional[Tuple[float, float]],
+              coverage: float, coats: float, round_up: bool = True, jobs: int = 1,
+              max_side: Optional[int] = None, reduce: int = 1, out=None) -> int:
+    """Measure ``paths`` on a pool of ``jobs`` processes, writing one CSV row per image as it finishes.
+    Throughput is reported on stderr at the end. Returns the number of failed images.
+    """
+    import csv
+    out = out or sys.stdout
+    writer = csv.DictWriter(out, fieldnames=BATCH_FIELDS)
+    writer.writeheader()
+    tasks = [(path, scale, ref, coverage, coats, round_up, max_side, reduce) for path in paths]
+    failed = 0
+    start = time.perf_counter()
+    if jobs == 1 or len(tasks) <= 1:
+        rows = map(_batch_worker, tasks)
+        pool = None
+    else:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes=min(jobs, len(tasks)), initializer=_batch_worker_init)
+        rows = pool.imap_unordered(_batch_worker, tasks, chunksize=1)
+    try:
+        for row in rows:
+            if row["error"]:
+                failed += 1
+            writer.writerow(row)
+            out.flush()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter() - start
+    rate = len(tasks) / elapsed if elapsed > 0 else float("inf")
+    print(f"Processed {len(tasks)} images ({failed} failed) in {elapsed:.2f}s: {rate:.1f} images/s "
+          f"with {jobs} job(s)", file=sys.stderr)
+    return failed
+
+
+def measure_views(front: str, top: Optional[str] = None, scale: Optional[float] = None,
+                  ref: Optional[Tuple[float, float]] = None, coverage: float = 10.0, coats: float = 2.0,
+                  round_up: bool = True, max_side: Optional[int] = None, reduce: int = 1,
+                  openings: bool = False, perspective: bool = False, side: Optional[str] = None,
+                  marker_m: Optional[float] = None, checkerboard: Optional[Tuple[int, int]] = None,
+                  aruco_dict: str = ARUCO_DICTIONARY, tiled: bool = False, workers: Optional[int] = None) -> dict:
+    """Measure one wall from its front view, plus depth from optional top and side views.
+    Returns the fields the CLI prints (JSON-serialisable); a failed top or side view only adds a
+    warning. The views are decoded and detected concurrently; ``timing_ms`` holds each one's duration
+    and ``depth_views`` the depth each depth view gave before ``fuse_depth`` combined them.
+    With ``openings`` windows and doors are detected and their area is left out of the paint estimate
+    (extra fields ``openings``, ``openings_m2`` and ``net_area_m2``). With ``perspective`` width and
+    height come from the wall quadrilateral rectified by ``rectify_quad`` (extra fields ``quad``,
+    ``rectified_px`` and ``homography``), falling back to the bbox with a warning.
+    With ``marker_m`` the scale comes from a printed marker of that size found by ``find_scale_marker``
+    in the front image (fields ``marker`` and ``scale_m_per_px``); ``scale``/``ref`` are only the
+    fallback when there is none. With ``tiled`` the .npy/TIFF views are read tile by tile on ``workers`` threads
+    (``detect_wall_bbox_tiled_path``), which only finds the bbox; other views are decoded whole.
+    """
+    if openings and perspective:
+        raise ValueError("openings and perspective cannot be combined")
+    if tiled and (openings or perspective or marker_m is not None):
+        raise ValueError("tiled images are measured by their bbox only")
+    warnings = []
+    quad = None
+    if openings:
+        detect_front = detect_wall_openings_path
+    elif perspective:
+        detect_front = detect_wall_quad_path
+    else:
+        detect_front = detect_wall_bbox_path
+    detect_tiled = None
+    if tiled:
+        import tiles
+        detect_tiled = lambda path, max_side, reduce: detect_wall_bbox_tiled_path(path, max_side, reduce, workers)
+    tasks = {}
+    for name, path, detect in (("front", front, detect_front), ("top", top, detect_wall_bbox_path),
+                               ("side", side, detect_wall_bbox_path)):
+        if path:
+            # only formats the tiled reader handles are read tile by tile; ordinary photos are decoded whole
+            tiled_view = detect_tiled is not None and path.lower().endswith(tiles.TILED_EXTENSIONS)
+            tasks[name] = (detect_tiled if tiled_view else detect, path)
+    if marker_m is not None:
+        tasks["marker"] = (lambda path, max_side, reduce: detect_scale_marker_path(path, checkerboard, aruco_dict,
+                                                                                    max_side), front)
+    detected = _detect_concurrently(tasks, max_side, reduce)
+    # a front view failure is fatal
+    front_result, timing_ms = detected.pop("front").result()
+    timings = {"front": timing_ms}
+    marker = None
+    if marker_m is not None:
+        marker, timings["marker"] = detected.pop("marker").result()
+        if marker is not None:
+            scale, ref = marker_scale(marker, marker_m), None
+        elif scale is None and ref is None:
+            raise ValueError("no scale marker found in the front image")
+        else:
+            warnings.append("no scale marker found in the front image, using the manual scale")
+    if openings:
+        (x, y, w_px, h_px), found = front_result
+    elif perspective:
+        (x, y, w_px, h_px), quad, size = front_result
+        if quad is None:
+            warnings.append("no four-sided wall outline found, measured the axis-aligned bbox")
+    else:
+        x, y, w_px, h_px = front_result
+    if quad is not None:
+        rect_w, rect_h, homography = rectify_quad(quad, size)
+    else:
+        rect_w, rect_h = w_px, h_px
+    width_m = px_to_meters(rect_w, scale, ref)
+    height_m = px_to_meters(rect_h, scale, ref)
+
+    # optional: depth from the top and/or side view; the wall's depth is the bbox width in both
+    depths = {}
+    for name, future in detected.items():
+        try:
+            (_, _, view_w_px, _), timings[name] = future.result()
+            depths[name] = px_to_meters(view_w_px, scale, ref)
+        except Exception as ex:
+            warnings.append(f"couldn't measure depth from {name} image: {ex}")
+    depth_m, warning = fuse_depth(depths.get("top"), depths.get("side"))
+    if warning:
+        warnings.append(warning)
+
+    area_m2 = width_m * height_m
+    result = {
+        "bbox": [int(x), int(y), int(w_px), int(h_px)],
+        "width_m": width_m,
+        "height_m": height_m,
+        "depth_m": depth_m,
+        "depth_views": depths,
+        "area_m2": area_m2,
+        "litres": estimate_paint_litres(area_m2, coverage, coats, round_up),
+        "timing_ms": {name: round(ms, 1) for name, ms in timings.items()},
+        "warnings": warnings,
+    }
+    if quad is not None:
+        result.update(quad=[[round(px, 2), round(py, 2)] for px, py in quad],
+                      rectified_px=[round(rect_w, 1), round(rect_h, 1)], homography=homography)
+    if openings:
+        openings_m2 = openings_area_m2(found, scale, ref)
+        net_area_m2 = max(0.0, area_m2 - openings_m2)
+        result.update(openings=[[int(v) for v in o] for o in found], openings_m2=openings_m2,
+                      net_area_m2=net_area_m2,
+                      litres=estimate_paint_litres(net_area_m2, coverage, coats, round_up))
+    if marker_m is not None:
+        result.update(marker=marker, scale_m_per_px=scale if marker is not None else None)
+    return result
+
+
+def _detect_concurrently(tasks: dict, max_side: Optional[int], reduce: int) -> dict:
+    """Run ``{view: (detect_fn, path)}`` with ``detect_fn(path, max_side, reduce)`` on one thread per
+    view (OpenCV releases the GIL while decoding and detecting). Returns completed futures of
+    (result, ms) keyed by view.
+    """
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+    def timed_call(fn, path):
+        start = time.perf_counter()
+        result = fn(path, max_side, reduce)
+        return result, (time.perf_counter() - start) * 1000.0
+
+    if len(tasks) == 1:
+        (name, (fn, path)), = tasks.items()
+        future = Future()
+        try:
+            future.set_result(timed_call(fn, path))
+        except Exception as ex:
+            future.set_exception(ex)
+        return {name: future}
+    with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+        return {name: pool.submit(timed_call, fn, path) for name, (fn, path) in tasks.items()}
+
+
+# top and side depth estimates further apart than this (relative to the larger) are reported
+DEPTH_TOLERANCE = 0.15
+
+
+def fuse_depth(top_m: Optional[float], side_m: Optional[float],
+               tolerance: float = DEPTH_TOLERANCE) -> Tuple[Optional[float], Optional[str]]:
+    """Combine the depth seen in the top and side views into (depth, warning).
+    With one estimate that one is used; with both their mean, plus a warning when they differ by more
+    than ``tolerance`` of the larger (one of the views probably framed something else).
+    """
+    if top_m is None or side_m is None:
+        return (top_m if side_m is None else side_m), None
+    depth_m = (top_m + side_m) / 2.0
+    larger = max(abs(top_m), abs(side_m))
+    if larger > 0 and abs(top_m - side_m) / larger > tolerance:
+        return depth_m, (f"top and side views disagree on depth ({top_m:.3f} m vs {side_m:.3f} m), "
+                         f"using the mean")
+    return depth_m, None
+
+
+def default_socket_path() -> str:
+    """Unix socket of the measurement daemon: $WALL_MEASURE_SOCKET or a per-user path in the temp dir."""
+    path = os.environ.get("WALL_MEASURE_SOCKET")
+    if path:
+        return path
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(os.environ.get("TMPDIR", "/tmp"), f"wall_measure-{uid}.sock")
+
+
+# measurement errors caused by the input (unreadable image, no scale): reported as "ERROR: ..." with exit
+# status 1 whether the daemon or this process measured; anything else is a bug and keeps its traceback
+INPUT_ERRORS = (ValueError, OSError)
+
+
+def _error_kind(ex: BaseException) -> str:
+    return "value" if isinstance(ex, ValueError) else "os"
+
+
+def report_error(message: str, kind: Optional[str] = None) -> None:
+    """Print a measurement error the same way on the daemon and in-process paths, then exit with status 1."""
+    print("ERROR:", message)
+    if kind == "value":
+        print("Provide --scale, --ref or a printed marker (--marker-size) to convert pixels to meters.")
+    sys.exit(1)
+
+
+def request_daemon(payload: dict, socket_path: Optional[str] = None, timeout: float = 300.0) -> Optional[dict]:
+    """Send one JSON request to a running measurement daemon and return its JSON reply.
+    Returns None when no daemon is listening or it does not answer in time, so callers can fall back to
+    measuring in-process.
+    """
+    import json
+    import socket
+    path = socket_path or default_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as fh:
+            line = fh.readline()
+        return json.loads(line) if line else None
+    except (OSError, ValueError):  # socket.timeout is an OSError; ValueError covers a truncated reply
+        return None
+    finally:
+        sock.close()
+
+
 def main():
     args = parse_args()
     # Prepare conversion inputs
@@ -88,47 +1126,76 @@ def main():
         px_len = float(args.ref[1])
         ref = (real_m, px_len)
 
-    # lazy-import cv2 to allow syntax checks without having opencv installed
-    try:
-        import cv2  # noqa: F401
-    except Exception:
-        print("ERROR: This tool requires OpenCV (cv2). Install with: pip install opencv-python")
-        return
+    batch_mode = bool(args.batch or args.manifest)
+    if not batch_mode and not args.no_daemon and (scale is not None or ref is not None or args.marker_size):
+        # a running daemon already has cv2 loaded and workers warm
+        reply = request_daemon({
+            "op": "measure",
+            "front": os.path.abspath(args.front),
+            "top": os.path.abspath(args.top) if args.top else None,
+            "side": os.path.abspath(args.side) if args.side else None,
+            "scale": scale, "ref": ref, "coverage": args.coverage, "coats": args.coats,
+            "round_up": args.round_up, "max_side": args.max_side, "reduce": args.reduce,
+            "openings": args.openings, "perspective": args.perspective, "marker_m": args.marker_size,
+            "checkerboard": args.checkerboard, "aruco_dict": args.aruco_dict, "tiled": args.tiled,
+            "workers": args.jobs,
+        }, args.socket)
+        if reply is not None:
+            if not reply.get("ok"):
+                report_error(reply.get("error"), reply.get("kind"))
+            print_result(reply["result"], args.coverage, args.coats)
+            return
 
-    front_img = load_image_cv(args.front)
-    x, y, w_px, h_px = find_wall_bbox_front(front_img)
+    # cv2 is imported lazily where it is used (it dominates start-up time); only check it is installed
+    import importlib.util
+    if importlib.util.find_spec("cv2") is None:
+        report_error("This tool requires OpenCV (cv2). Install with: pip install opencv-python")
 
-    # compute sizes
-    try:
-        width_m = px_to_meters(w_px, scale, ref)
-        height_m = px_to_meters(h_px, scale, ref)
-    except ValueError as e:
-        print("ERROR:", e)
-        print("Provide either --scale or --ref to convert pixels to meters.")
+    if batch_mode:
+        if scale is None and ref is None:
+            report_error("Provide either --scale or --ref to convert pixels to meters.")
+        paths = list(iter_batch_paths(args.batch, args.manifest))
+        if not paths:
+            report_error("No images found for batch run")
+        failed = run_batch(paths, scale, ref, args.coverage, args.coats, args.round_up, args.jobs,
+                           args.max_side, args.reduce)
+        if failed:
+            sys.exit(1)
         return
 
-    depth_m = None
-    # optional: use top view width as depth
-    if args.top:
-        try:
-            top_img = load_image_cv(args.top)
-            _, _, top_w_px, top_h_px = find_wall_bbox_front(top_img)
-            # assume top view's bounding width corresponds to wall depth in px
-            depth_m = px_to_meters(top_w_px, scale, ref)
-        except Exception as ex:
-            print("Warning: couldn't measure depth from top image:", ex)
+    try:
+        result = measure_views(args.front, args.top, scale, ref, args.coverage, args.coats, args.round_up,
+                               args.max_side, args.reduce, args.openings, args.perspective, args.side,
+                               args.marker_size, args.checkerboard, args.aruco_dict, args.tiled, args.jobs)
+    except INPUT_ERRORS as e:
+        report_error(str(e), _error_kind(e))
+    print_result(result, args.coverage, args.coats)
 
-    area_m2 = width_m * height_m
-    litres = estimate_paint_litres(area_m2, args.coverage, args.coats, args.round_up)
+
+def print_result(result: dict, coverage: float, coats: float) -> None:
+    for warning in result.get("warnings", []):
+        print("Warning:", warning)
 
     print("Wall measurement results:")
-    print(f" - Width (m): {width_m:.3f}")
-    print(f" - Height (m): {height_m:.3f}")
-    if depth_m is not None:
-        print(f" - Depth (m, from top view): {depth_m:.3f}")
-    print(f" - Area (m^2): {area_m2:.3f}")
-    print(f" - Paint coverage: {args.coverage} m^2/L, Coats: {args.coats}")
-    print(f" - Estimated paint required: {litres} L")
+    marker = result.get("marker")
+    if marker is not None:
+        name = "checkerboard" if marker["kind"] == "checkerboard" else f"ArUco marker #{marker['id']}"
+        print(f" - Scale (m/px, from {name}, side {marker['side_px']:.1f} px): {result['scale_m_per_px']:.6f}")
+    print(f" - Width (m): {result['width_m']:.3f}")
+    print(f" - Height (m): {result['height_m']:.3f}")
+    if result["depth_m"] is not None:
+        views = " and ".join(result.get("depth_views") or {"top": None})
+        print(f" - Depth (m, from {views} view): {result['depth_m']:.3f}")
+    if result.get("rectified_px") is not None:
+        print(" - Perspective corrected: rectified wall {:.0f} x {:.0f} px".format(*result["rectified_px"]))
+    print(f" - Area (m^2): {result['area_m2']:.3f}")
+    if result.get("openings") is not None:
+        print(f" - Windows/doors: {len(result['openings'])}, {result['openings_m2']:.3f} m^2")
+        print(f" - Paintable area (m^2): {result['net_area_m2']:.3f}")
+    print(f" - Paint coverage: {coverage} m^2/L, Coats: {coats}")
+    print(f" - Estimated paint required: {result['litres']} L")
+    if len(result.get("timing_ms") or {}) > 1:
+        print(" - Time per view (ms): " + ", ".join(f"{k} {v:.1f}" for k, v in result["timing_ms"].items()))
 
     print("\nNotes:")
     print(" - For accurate absolute sizes provide --scale (meters per pixel) or --ref REAL_M PX")
@@ -0,0 +1,15 @@
+"""
+WSGI entry point for production serving:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Importing this module loads cv2, numpy and the Flask app, so with ``preload_app`` they are
+imported and initialised once in the master process and shared copy-on-write by the workers.
+"""
+import cv2
+import numpy as np  # noqa: F401
+
+from server import app  # noqa: F401
+
+# the first decode pays one-off codec initialisation; do it before fork
+cv2.imdecode(np.zeros(1, np.uint8), cv2.IMREAD_COLOR)